@@ -0,0 +1,124 @@
+"""Compare the thread and async download engines against a local HTTP server.
+
+Run from the repository root:
+
+    python -m benchmarks.download_engines --files 200 --concurrent 100
+
+The stand-in server answers every request after a fixed delay to mimic CDN
+latency. Only the download stage is measured, processing is not involved.
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.config import Config
+from src.downloader import AsyncMemoryDownloader, DownloadTask, HttpSession
+from src.memories import Memory
+
+
+def make_handler(body: bytes, latency: float) -> type[BaseHTTPRequestHandler]:
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args: object) -> None:
+            pass
+
+    return StandInHandler
+
+
+def build_memories(port: int, files: int) -> list[Memory]:
+    return [
+        Memory.model_validate(
+            {
+                "Date": f"2023-12-05 {index // 3600:02d}:"
+                f"{index // 60 % 60:02d}:{index % 60:02d} UTC",
+                "Media Download Url": f"http://127.0.0.1:{port}/{index}",
+                "Media Type": "Video",
+                "Location": None,
+            },
+        )
+        for index in range(files)
+    ]
+
+
+def run_thread_engine(memories: list[Memory]) -> int:
+    max_workers = Config.cli_options["max_concurrent_downloads"]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda m: DownloadTask(m).run(), memories))
+    HttpSession.close()
+    return sum(succeeded for _, succeeded in results)
+
+
+def run_async_engine(memories: list[Memory]) -> int:
+    async def download_all() -> list[tuple[Path | None, bool]]:
+        semaphore = asyncio.Semaphore(Config.cli_options["max_concurrent_downloads"])
+        async with AsyncMemoryDownloader.open_http_session() as http_session:
+
+            async def download(memory: Memory) -> tuple[Path | None, bool]:
+                async with semaphore:
+                    return await DownloadTask(memory).run_async(http_session)
+
+            return await asyncio.gather(*(download(m) for m in memories))
+
+    results = asyncio.run(download_all())
+    return sum(succeeded for _, succeeded in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--concurrent", type=int, default=100)
+    parser.add_argument("--size", type=int, default=256 * 1024, metavar="BYTES")
+    parser.add_argument("--latency", type=float, default=0.2, metavar="SECONDS")
+    args = parser.parse_args()
+
+    handler = make_handler(b"\0" * args.size, args.latency)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    Config.cli_options = {
+        "max_concurrent_downloads": args.concurrent,
+        "strict_location": False,
+        "log_level": logging.CRITICAL,
+        "request_timeout": 30,
+        "stream_chunk_size": 1024 * 1024,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+    }
+    engines = {"thread": run_thread_engine, "async": run_async_engine}
+
+    try:
+        for name, run_engine in engines.items():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                Config.downloads_folder = Path(tmpdir)
+                memories = build_memories(server.server_address[1], args.files)
+                start = time.perf_counter()
+                succeeded = run_engine(memories)
+                elapsed = time.perf_counter() - start
+            print(
+                f"{name:>6}: {succeeded}/{args.files} files in {elapsed:.2f}s "
+                f"({args.files / elapsed:.1f} files/s)"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
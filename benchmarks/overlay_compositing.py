@@ -0,0 +1,114 @@
+"""Compare full-frame alpha compositing against blending only the caption box.
+
+Run from the repository root:
+
+    python -m benchmarks.overlay_compositing --runs 20
+
+A photo-sized JPEG gets a transparent overlay with a caption band, the typical
+Snapchat layout. The blend step is timed alone on a decoded photo, then end to
+end, where both ways also decode the photo and encode the result as JPEG.
+"""
+
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from src.config import Config
+from src.overlay import ImageComposer, OverlayCache
+
+
+def make_inputs(width: int, height: int, band: int) -> tuple[bytes, bytes]:
+    photo = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    photo_buffer = BytesIO()
+    photo.save(photo_buffer, format="JPEG", quality=95)
+
+    overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    top = height * 2 // 3
+    ImageDraw.Draw(overlay).rectangle(
+        (0, top, width - 1, top + band), fill=(0, 0, 0, 140)
+    )
+    overlay_buffer = BytesIO()
+    overlay.save(overlay_buffer, format="PNG")
+    return photo_buffer.getvalue(), overlay_buffer.getvalue()
+
+
+def full_frame(photo_bytes: bytes, overlay_bytes: bytes) -> bytes:
+    # The previous ImageComposer: RGBA conversion and a composite over every pixel
+    photo = Image.open(BytesIO(photo_bytes)).convert("RGBA")
+    overlay = Image.open(BytesIO(overlay_bytes)).convert("RGBA")
+    combined = Image.alpha_composite(photo, overlay).convert("RGB")
+    output = BytesIO()
+    combined.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+def visible_box(photo_bytes: bytes, overlay_bytes: bytes) -> bytes:
+    return ImageComposer(photo_bytes, overlay_bytes).apply_overlay()
+
+
+def measure(step: Callable[..., object], runs: int, *inputs: bytes) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        step(*inputs)
+    return (time.perf_counter() - start) / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    parser.add_argument("--band", type=int, default=160, metavar="PIXELS")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Clear the overlay cache before every run, as for unique captions",
+    )
+    args = parser.parse_args()
+
+    Config.cli_options = {"jpeg_quality": 95, "log_level": logging.CRITICAL}
+    inputs = make_inputs(args.width, args.height, args.band)
+
+    def region(photo_bytes: bytes, overlay_bytes: bytes) -> bytes:
+        if args.no_cache:
+            OverlayCache.close()
+        return visible_box(photo_bytes, overlay_bytes)
+
+    photo = Image.open(BytesIO(inputs[0]))
+    photo.load()
+    overlay = Image.open(BytesIO(inputs[1])).convert("RGBA")
+    visible_overlay, offset, _ = OverlayCache.visible_region(inputs[1], photo.size)
+
+    def blend_full_frame() -> None:
+        Image.alpha_composite(photo.convert("RGBA"), overlay).convert("RGB")
+
+    def blend_visible_box() -> None:
+        # The copy stands in for the decode the composer pastes into
+        photo.copy().paste(visible_overlay, offset, mask=visible_overlay)
+
+    report(
+        "blend",
+        measure(blend_full_frame, args.runs),
+        measure(blend_visible_box, args.runs),
+    )
+    report(
+        "end to end",
+        measure(full_frame, args.runs, *inputs),
+        measure(region, args.runs, *inputs),
+    )
+    OverlayCache.close()
+
+
+def report(step: str, full_seconds: float, region_seconds: float) -> None:
+    print(
+        f"{step}: full frame {full_seconds * 1000:.1f} ms/photo, visible box "
+        f"{region_seconds * 1000:.1f} ms/photo ({full_seconds / region_seconds:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare reading video sizes from the MP4 header against spawning a prober.
+
+Run from the repository root:
+
+    python -m benchmarks.video_probe --files 50
+
+A short test video is rendered with the bundled ffmpeg, then probed once per
+file both ways. ffprobe is used when installed, otherwise `ffmpeg -i` stands in
+for it, which costs the same process start and demux.
+"""
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from imageio_ffmpeg import get_ffmpeg_exe
+
+from src.overlay.mp4_header import probe_video, read_faststart_header
+
+
+def render_video(path: Path, size: str, seconds: int) -> bytes:
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc=size={size}:rate=30:duration={seconds}",
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return path.read_bytes()
+
+
+def probe_command(video_path: Path) -> list[str]:
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return [get_ffmpeg_exe(), "-hide_banner", "-i", str(video_path)]
+    return [
+        ffprobe,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=width,height",
+        "-of",
+        "csv=p=0",
+        str(video_path),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size", type=str, default="1080x1920")
+    parser.add_argument("--seconds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video_path = Path(tmpdir) / "video.mp4"
+        video = render_video(video_path, args.size, args.seconds)
+
+        command = probe_command(video_path)
+        start = time.perf_counter()
+        for _ in range(args.files):
+            subprocess.run(command, capture_output=True, check=False)
+        subprocess_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.files):
+            video_info = probe_video(read_faststart_header(BytesIO(video)))
+        parser_elapsed = time.perf_counter() - start
+
+    subprocess_ms = subprocess_elapsed / args.files * 1000
+    parser_ms = parser_elapsed / args.files * 1000
+    print(f"{Path(command[0]).name}: {subprocess_ms:.2f} ms/file")
+    print(f"parser: {parser_ms:.3f} ms/file ({video_info})")
+    print(f"speedup: {subprocess_ms / parser_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from src.filename_resolver import FileNameResolver
+from src.output_layout import OutputLayout
 from src.zip_processor import ZipProcessor
 
-__all__ = ["FileNameResolver", "ZipProcessor"]
+__all__ = ["FileNameResolver", "OutputLayout", "ZipProcessor"]
@@ -1,4 +1,6 @@
 import argparse
+import os
+from pathlib import Path
 
 
 # Validate CRF value there to escape long help messages
@@ -36,6 +38,117 @@ def get_cli_args() -> argparse.Namespace:
         metavar="N",
         help="Concurrent downloads (default: 5). Short: -c",
     )
+    parser.add_argument(
+        "--min-concurrent",
+        "-mc",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Adapt concurrency between N and -c from throughput, latency and \
+            rate limiting (default: off, -c stays fixed). Short: -mc",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        "-rl",
+        type=float,
+        default=None,
+        metavar="REQUESTS",
+        help="Max download requests per second across all workers \
+            (default: unlimited). Short: -rl",
+    )
+    parser.add_argument(
+        "--bandwidth-limit",
+        "-bw",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Max bytes per second downloaded across all workers \
+            (default: unlimited). Short: -bw",
+    )
+    parser.add_argument(
+        "--processing-workers",
+        "-pw",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Files processed in parallel (overlay, metadata, conversion) while \
+            downloads continue (default: number of CPU cores). Short: -pw",
+    )
+    parser.add_argument(
+        "--cpu-workers",
+        "-cw",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Worker processes for image overlay and metadata encoding, \
+            0 runs them in the processing threads instead \
+            (default: number of CPU cores). Short: -cw",
+    )
+    parser.add_argument(
+        "--jxl-workers",
+        "-jw",
+        type=int,
+        default=max((os.cpu_count() or 1) // 4, 1),
+        metavar="N",
+        help="JPEG XL conversions run at once, each cjxl gets an equal share of \
+            the cores at low priority (default: a quarter of the CPU cores). \
+            Short: -jw",
+    )
+    parser.add_argument(
+        "--engine",
+        "-e",
+        type=str,
+        choices=["thread", "async"],
+        default="thread",
+        help="Download engine: thread (default, one download per thread) or async \
+            (many downloads on one event loop, suits high -c values). Short: -e",
+    )
+    parser.add_argument(
+        "--stream-chunk-size",
+        "-cs",
+        type=int,
+        default=1024 * 1024,
+        metavar="BYTES",
+        help="Bytes read per chunk while streaming downloads to disk \
+            (default: 1048576). Short: -cs",
+    )
+    parser.add_argument(
+        "--layout",
+        "-L",
+        type=str,
+        choices=["flat", "year", "month"],
+        default="flat",
+        help="Output folders: flat (default, everything in downloads/), \
+            year (downloads/YYYY/) or month (downloads/YYYY/MM/). Short: -L",
+    )
+    parser.add_argument(
+        "--zip-memory-limit",
+        "-zm",
+        type=int,
+        default=4 * 1024 * 1024,
+        metavar="BYTES",
+        help="ZIP downloads up to this size are unpacked from memory without \
+            touching disk, 0 always writes them to disk (default: 4194304). \
+            Short: -zm",
+    )
+    parser.add_argument(
+        "--scratch-dir",
+        "-sd",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Folder for short-lived video files ffmpeg needs to seek, a tmpfs \
+            keeps them off the disk (default: system temp folder). Short: -sd",
+    )
+    parser.add_argument(
+        "--state-db",
+        "-db",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Track each memory's status, attempts and outputs in a SQLite \
+            database instead of pruning the JSON (default: off). Short: -db",
+    )
     parser.add_argument(
         "--no-overlay",
         "-O",
@@ -56,7 +169,7 @@ def get_cli_args() -> argparse.Namespace:
         type=int,
         default=3,
         metavar="N",
-        help="Max retry attempts (default: 3). Short: -a",
+        help="Max attempts per file, transient errors only (default: 3). Short: -a",
     )
     parser.add_argument(
         "--strict",
@@ -6,6 +6,13 @@ from src.config.logging_config import parse_log_level
 def build_cli_options(args: argparse.Namespace) -> dict:
     return {
         "max_concurrent_downloads": args.concurrent,
+        "min_concurrent_downloads": args.min_concurrent,
+        "rate_limit": args.rate_limit,
+        "bandwidth_limit": args.bandwidth_limit,
+        "processing_workers": args.processing_workers,
+        "cpu_workers": args.cpu_workers,
+        "jxl_workers": args.jxl_workers,
+        "download_engine": args.engine,
         "apply_overlay": not args.no_overlay,
         "write_metadata": not args.no_metadata,
         "max_attempts": args.attempts,
@@ -15,6 +22,11 @@ def build_cli_options(args: argparse.Namespace) -> dict:
         "convert_to_jxl": not args.no_jxl,
         "log_level": parse_log_level(args.log_level),
         "request_timeout": args.request_timeout,
+        "stream_chunk_size": args.stream_chunk_size,
+        "zip_memory_limit": args.zip_memory_limit,
+        "scratch_dir": args.scratch_dir,
+        "state_db": args.state_db,
+        "output_layout": args.layout,
         "ffmpeg_timeout": args.ffmpeg_timeout,
         "ffmpeg_preset": args.ffmpeg_preset,
         "ffmpeg_pixel_format": args.ffmpeg_pixel_format,
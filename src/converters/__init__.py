@@ -1,4 +1,5 @@
+from src.converters.cjxl_pool import CjxlPool
 from src.converters.ffmpeg_converter import VideoConverter
 from src.converters.jxl_converter import JXLConverter
 
-__all__ = ["JXLConverter", "VideoConverter"]
+__all__ = ["CjxlPool", "JXLConverter", "VideoConverter"]
@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from src.config import Config
+
+# Below normal priority, so downloads and the other stages stay responsive
+CJXL_NICENESS = 10
+
+
+class CjxlPool:
+    _executor: ThreadPoolExecutor | None = None
+    _lock = Lock()
+
+    @classmethod
+    def run(
+        cls, command: list[str], timeout: int, jpeg_bytes: bytes | None = None
+    ) -> subprocess.CompletedProcess:
+        # However many processing threads convert at once, only --jxl-workers
+        # cjxl processes run, the others wait here for a free worker
+        return cls._get().submit(_run_cjxl, command, timeout, jpeg_bytes).result()
+
+    @classmethod
+    def threads_per_process(cls) -> int:
+        # Workers times threads matches the core count instead of multiplying it
+        return max((os.cpu_count() or 1) // cls._workers(), 1)
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            if cls._executor is None:
+                return
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+
+    @staticmethod
+    def _workers() -> int:
+        return max(Config.cli_options["jxl_workers"], 1)
+
+    @classmethod
+    def _get(cls) -> ThreadPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls._workers(), thread_name_prefix="cjxl"
+                )
+            return cls._executor
+
+
+def _run_cjxl(
+    command: list[str], timeout: int, jpeg_bytes: bytes | None
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        _with_low_priority(command),
+        input=jpeg_bytes,
+        capture_output=True,
+        timeout=timeout,
+        check=False,
+        creationflags=_priority_creation_flags(),
+    )
+
+
+def _with_low_priority(command: list[str]) -> list[str]:
+    nice_path = shutil.which("nice") if sys.platform != "win32" else None
+    if nice_path is None:
+        return command
+    return [nice_path, "-n", str(CJXL_NICENESS), *command]
+
+
+def _priority_creation_flags() -> int:
+    if hasattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS"):
+        return subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    return 0
@@ -1,26 +1,85 @@
+import shutil
 import subprocess
+from contextlib import suppress
 from pathlib import Path
+from threading import Thread
+from typing import BinaryIO
 
 from imageio_ffmpeg import get_ffmpeg_exe
 
 from src.config import Config
 
+# The overlay is already sized to the video, it is drawn over the top-left corner
+OVERLAY_FILTER = "[0:v][1:v]overlay=0:0[video]"
+
 
 class VideoConverter:
-    def __init__(self, file_path: Path) -> None:
+    # One ffmpeg pass: optional overlay, re-encode and metadata share the decode
+    def __init__(
+        self,
+        file_path: Path,
+        overlay_path: Path | None = None,
+        metadata_arguments: list[str] | None = None,
+        source: Path | BinaryIO | None = None,
+    ) -> None:
         self.file_path = file_path
+        self.overlay_path = overlay_path
+        self.metadata_arguments = metadata_arguments or []
+        # The input video, file_path itself unless it comes from elsewhere
+        self.source = file_path if source is None else source
 
     def run(self) -> Path:
-        command = self._build_ffmpeg_command()
-        subprocess.run(command, check=True)
+        # ffmpeg can't write over its own input, so it renders next to it first
+        temporary_video_path = self.file_path.with_suffix(".tmp.mp4")
+        command = self._build_ffmpeg_command(temporary_video_path)
+        timeout = Config.cli_options["ffmpeg_timeout"]
+        try:
+            if isinstance(self.source, Path):
+                subprocess.run(
+                    command, check=True, capture_output=True, timeout=timeout
+                )
+            else:
+                self._run_with_piped_source(command, timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            temporary_video_path.unlink(missing_ok=True)
+            raise
+        temporary_video_path.replace(self.file_path)
         return self.file_path
 
-    def _build_ffmpeg_command(self) -> list[str]:
+    def _run_with_piped_source(self, command: list[str], timeout: int) -> None:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # A thread feeds stdin so communicate() only drains the output pipes
+        stdin, process.stdin = process.stdin, None
+        feeder = Thread(target=self._feed_source, args=(stdin,), daemon=True)
+        feeder.start()
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            feeder.join()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, command, stdout, stderr
+            )
+
+    def _feed_source(self, stdin: BinaryIO) -> None:
+        # ffmpeg may stop reading early, its exit code then tells why
+        with suppress(OSError), stdin:
+            shutil.copyfileobj(self.source, stdin)
+
+    def _build_ffmpeg_command(self, temporary_video_path: Path) -> list[str]:
         return [
             get_ffmpeg_exe(),
             "-y",
-            "-i",
-            str(self.file_path),
+            *self._input_arguments(),
             "-c:a",
             "copy",
             "-c:v",
@@ -31,7 +90,25 @@ class VideoConverter:
             self._get_ffmpeg_preset(),
             "-pix_fmt",
             self._get_video_pixel_format(),
-            str(self.file_path),
+            *self.metadata_arguments,
+            str(temporary_video_path),
+        ]
+
+    def _input_arguments(self) -> list[str]:
+        video_input = str(self.source) if isinstance(self.source, Path) else "pipe:0"
+        if self.overlay_path is None:
+            return ["-i", video_input]
+        return [
+            "-i",
+            video_input,
+            "-i",
+            str(self.overlay_path),
+            "-filter_complex",
+            OVERLAY_FILTER,
+            "-map",
+            "[video]",
+            "-map",
+            "0:a?",
         ]
 
     def _get_video_codec(self) -> str:
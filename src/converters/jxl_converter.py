@@ -4,6 +4,8 @@ import sys
 from pathlib import Path
 
 from src.config import Config
+from src.converters.cjxl_pool import CjxlPool
+from src.filename_resolver import FileNameResolver
 from src.logger import log
 
 
@@ -17,12 +19,12 @@ class JXLConverter:
         cjxl_path = JXLConverter._get_cjxl_path()
         if cjxl_path is None:
             return self.input_path
-        output_path = self.input_path.with_suffix(".jxl")
+        return self._convert_file(cjxl_path, self._output_path())
+
+    def _convert_file(self, cjxl_path: Path | str, output_path: Path) -> Path:
         command = self._build_cjxl_command(cjxl_path, output_path)
         timeout = Config.cli_options["cjxl_timeout"]
-        result = subprocess.run(
-            command, capture_output=True, timeout=timeout, check=False
-        )
+        result = CjxlPool.run(command, timeout)
         if result.returncode != 0:
             self._log_cjxl_failure(result)
             return self.input_path
@@ -30,6 +32,28 @@ class JXLConverter:
             self.input_path.unlink()
         return output_path
 
+    def run_from_bytes(self, jpeg_bytes: bytes) -> Path:
+        # The encoded JPEG goes to cjxl on stdin, input_path is only written
+        # when the JPEG has to be kept
+        cjxl_path = JXLConverter._get_cjxl_path()
+        if cjxl_path is None:
+            self.input_path.write_bytes(jpeg_bytes)
+            return self.input_path
+        output_path = self._output_path()
+        command = self._build_cjxl_command(cjxl_path, output_path, source="-")
+        timeout = Config.cli_options["cjxl_timeout"]
+        result = CjxlPool.run(command, timeout, jpeg_bytes)
+        if result.returncode == 0:
+            return output_path
+        # cjxl builds without stdin support still convert the file on disk
+        output_path.unlink(missing_ok=True)
+        self.input_path.write_bytes(jpeg_bytes)
+        return self._convert_file(cjxl_path, output_path)
+
+    def _output_path(self) -> Path:
+        # Reserved like every other output, so no later file is handed this name
+        return FileNameResolver(self.input_path.with_suffix(".jxl")).run()
+
     @staticmethod
     def _get_cjxl_path() -> Path | str | None:
         # On macOS, use system-installed cjxl from Homebrew
@@ -66,13 +90,14 @@ class JXLConverter:
         )
 
     def _build_cjxl_command(
-        self, cjxl_path: Path | str, output_path: Path
+        self, cjxl_path: Path | str, output_path: Path, source: str | None = None
     ) -> list[str]:
         return [
             str(cjxl_path),
             "--lossless_jpeg=1",
             "--effort=9",
-            str(self.input_path),
+            f"--num_threads={CjxlPool.threads_per_process()}",
+            source or str(self.input_path),
             str(output_path),
         ]
 
@@ -1,6 +1,17 @@
+from src.downloader.async_downloader import AsyncMemoryDownloader
 from src.downloader.download_service import DownloadService
 from src.downloader.download_task import DownloadTask
 from src.downloader.downloader import MemoryDownloader
+from src.downloader.http_session import HttpSession
+from src.downloader.processing_stage import ProcessingStage
 from src.downloader.setup_downloader import SetupDownloader
 
-__all__ = ["DownloadService", "DownloadTask", "MemoryDownloader", "SetupDownloader"]
+__all__ = [
+    "AsyncMemoryDownloader",
+    "DownloadService",
+    "DownloadTask",
+    "HttpSession",
+    "MemoryDownloader",
+    "ProcessingStage",
+    "SetupDownloader",
+]
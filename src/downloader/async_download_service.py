@@ -0,0 +1,96 @@
+import asyncio
+from hashlib import sha256
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, BinaryIO
+
+from aiohttp import ClientError, ClientResponse, ClientSession
+
+from src.config import Config
+from src.downloader.download_service import DownloadService
+from src.downloader.part_file import PartFile
+from src.downloader.rate_limiter import RateLimiter
+from src.logger import log
+from src.memories import Memory
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+
+class AsyncDownloadService(DownloadService):
+    def __init__(self, memory: Memory, http_session: ClientSession) -> None:
+        super().__init__(memory)
+        self.http_session = http_session
+
+    async def run(self) -> tuple[Path | BinaryIO | None, bool]:
+        self.memory.download_bytes = 0
+        try:
+            file_path = await self._fetch()
+        except (ClientError, asyncio.TimeoutError) as e:
+            log(
+                f"Failed to download {self.memory.filename_with_ext}: {e}",
+                "error",
+                "NET",
+            )
+            self.memory.error_code = "NET"
+            return None, False
+
+        return file_path, file_path is not None
+
+    async def _fetch(self) -> Path | BinaryIO | None:
+        part_file = PartFile(self.memory)
+        if part_file.is_finished():
+            # Hashing the whole file must not stall the other downloads
+            return await asyncio.to_thread(self._promote_finished_part, part_file)
+
+        started_at = perf_counter()
+        async with self.http_session.get(
+            self.memory.media_download_url,
+            headers=self._request_headers(part_file),
+        ) as response:
+            self.memory.response_seconds = perf_counter() - started_at
+            if response.status >= 400:
+                self._handle_fetch_failure(response.status, response.headers, part_file)
+                return None
+
+            if not part_file.accepts(response.status, response.headers):
+                self._handle_range_mismatch(part_file)
+                return None
+
+            self.memory.is_zip = self._is_zip_response(response, part_file)
+            if self._keeps_zip_in_memory(response.headers, part_file):
+                return await self._store_streamed_zip_in_memory(response)
+            return await self._store_streamed_memory(response, part_file)
+
+    async def _store_streamed_memory(
+        self, download_response: ClientResponse, part_file: PartFile
+    ) -> Path | None:
+        # Hashing the kept bytes of a large .part must not stall the event loop
+        digest = await asyncio.to_thread(
+            part_file.start_digest, download_response.status
+        )
+        with part_file.open_for(
+            download_response.status, download_response.headers
+        ) as f:
+            await self._copy_body_async(download_response, f, digest)
+        return self._finalize_part_file(part_file)
+
+    async def _store_streamed_zip_in_memory(
+        self, download_response: ClientResponse
+    ) -> BinaryIO | None:
+        buffer = self._open_zip_buffer()
+        await self._copy_body_async(download_response, buffer, sha256())
+        return self._finalize_zip_buffer(buffer, download_response.headers)
+
+    async def _copy_body_async(
+        self, download_response: ClientResponse, sink: BinaryIO, digest: "_Hash"
+    ) -> None:
+        # The one chunk loop of this engine, for .part files and buffers alike
+        chunk_size = Config.cli_options["stream_chunk_size"]
+        async for chunk in download_response.content.iter_chunked(chunk_size):
+            sink.write(chunk)
+            digest.update(chunk)
+            self.memory.download_bytes += len(chunk)
+            if delay := RateLimiter.bytes_delay(len(chunk)):
+                await asyncio.sleep(delay)
+        self.memory.content_digest = digest.hexdigest()
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from threading import Semaphore, Thread
+from typing import BinaryIO
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from src.config import Config
+from src.downloader.download_task import DownloadTask
+from src.downloader.downloader import MemoryDownloader
+from src.downloader.rate_limiter import RateLimiter
+from src.downloader.stage_meter import StageMeter
+from src.logger import log
+from src.memories import Memory
+
+BACKOFF_POLL_SECONDS = 0.25
+
+
+class AsyncMemoryDownloader(MemoryDownloader):
+    def _execute_downloads(self) -> None:
+        self.download_meter = StageMeter(Config.cli_options["max_concurrent_downloads"])
+        # Released by the collector, so finished but unread results count too
+        self._window = Semaphore(self._submit_window())
+        # The event loop is the download stage, results are read on this thread
+        Thread(
+            target=asyncio.run,
+            args=(self._execute_async_downloads(),),
+            name="async-downloads",
+            daemon=True,
+        ).start()
+        self._collect_results()
+
+    def _cancel_queued_downloads(self) -> None:
+        # Nothing is queued beyond the window, the producer sees the stop flag
+        # and marks submission complete itself
+        pass
+
+    def _collect_next_result(self) -> None:
+        collected_count = self._collected_count
+        super()._collect_next_result()
+        if self._collected_count > collected_count:
+            self._window.release()
+
+    async def _execute_async_downloads(self) -> None:
+        self._slot_freed = asyncio.Condition()
+        running = set()
+        async with self.open_http_session() as http_session:
+            try:
+                for memory in self._gather_download_tasks():
+                    if not self._window.acquire(blocking=False):
+                        await asyncio.to_thread(self._window.acquire)
+                    if self._stopping.is_set():
+                        break
+                    self._submitted_count += 1
+                    task = asyncio.create_task(
+                        self._download_and_hand_over_async(memory, http_session)
+                    )
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    # Let started downloads run while the export is still parsed
+                    await asyncio.sleep(0)
+            finally:
+                self._all_submitted = True
+                self.processing_stage.wake_collector()
+            await asyncio.gather(*running)
+
+    async def _download_and_hand_over_async(
+        self,
+        memory: Memory,
+        http_session: ClientSession,
+    ) -> None:
+        file_path, download_succeeded = None, False
+        try:
+            while True:
+                file_path, download_succeeded = await self._download_once_async(
+                    memory, http_session
+                )
+                if download_succeeded:
+                    break
+                backoff = self._plan_retry(memory)
+                if backoff is None or await self._backoff_async(backoff):
+                    break
+        except Exception as e:
+            # A task that dies here would never post its result or free the window
+            log(f"Failed to download {memory.filename_with_ext}: {e}", "error", "FILE")
+            memory.error_code = "FILE"
+            file_path, download_succeeded = None, False
+        finally:
+            # Waiting for a free queue slot must not block the event loop
+            await asyncio.to_thread(
+                self.processing_stage.hand_over,
+                memory,
+                file_path,
+                download_succeeded,
+            )
+
+    @asynccontextmanager
+    async def _download_slot(self) -> AsyncIterator[float]:
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(self.concurrency.try_acquire)
+        try:
+            yield time.perf_counter()
+        finally:
+            # Also wakes waiters after the controller widened the limit
+            self.concurrency.release()
+            async with self._slot_freed:
+                self._slot_freed.notify_all()
+
+    async def _download_once_async(
+        self, memory: Memory, http_session: ClientSession
+    ) -> tuple[Path | BinaryIO | None, bool]:
+        memory.attempts += 1
+        memory.error_code = None
+        # Rate limits and Retry-After pauses are waited out before taking a slot
+        delay = RateLimiter.request_delay()
+        if delay and await self._backoff_async(delay):
+            memory.error_code = "INT"
+            return None, False
+
+        # The slot is only held while downloading, not during the backoff
+        async with self._download_slot() as started_at:
+            with self.download_meter.busy() as timing:
+                file_path, download_succeeded = await DownloadTask(memory).run_async(
+                    http_session
+                )
+            memory.download_seconds = timing.seconds
+            self.concurrency.record(memory, started_at)
+        return file_path, download_succeeded
+
+    async def _backoff_async(self, backoff: float) -> bool:
+        # Sleeps in short steps so Ctrl+C does not wait out a long backoff
+        deadline = time.monotonic() + backoff
+        while (remaining := deadline - time.monotonic()) > 0:
+            if self._stopping.is_set():
+                return True
+            await asyncio.sleep(min(remaining, BACKOFF_POLL_SECONDS))
+        return self._stopping.is_set()
+
+    @staticmethod
+    def open_http_session() -> ClientSession:
+        max_concurrent = Config.cli_options["max_concurrent_downloads"]
+        request_timeout = Config.cli_options["request_timeout"]
+        return ClientSession(
+            connector=TCPConnector(limit=max_concurrent),
+            timeout=ClientTimeout(
+                sock_connect=request_timeout, sock_read=request_timeout
+            ),
+        )
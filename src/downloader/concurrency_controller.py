@@ -0,0 +1,109 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Condition
+from time import perf_counter
+
+from src.config import Config
+from src.downloader.retry_policy import RetryPolicy
+from src.logger import log
+from src.memories import Memory
+
+DECREASE_FACTOR = 0.5
+# Mean time to first byte this many times above the best epoch means queuing
+LATENCY_TOLERANCE = 2.0
+# Widening further only pays off while throughput keeps up with the last epoch
+THROUGHPUT_TOLERANCE = 0.9
+
+
+# AIMD: every epoch of `limit` clean downloads widens the limit by one while
+# latency and throughput hold up, transient errors halve it once per epoch.
+# Without --min-concurrent the range is a single value and nothing changes.
+class ConcurrencyController:
+    def __init__(self, minimum: int, maximum: int) -> None:
+        self.minimum = max(1, min(minimum, maximum))
+        self.maximum = maximum
+        self.limit = self.minimum
+        self._active = 0
+        self._condition = Condition()
+        self._last_decrease_at = perf_counter()
+        self._baseline_latency: float | None = None
+        self._last_throughput = 0.0
+        self._start_epoch()
+
+    @classmethod
+    def from_config(cls) -> "ConcurrencyController":
+        maximum = Config.cli_options["max_concurrent_downloads"]
+        minimum = Config.cli_options["min_concurrent_downloads"]
+        return cls(maximum if minimum is None else minimum, maximum)
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._active >= self.limit:
+                return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        try:
+            yield perf_counter()
+        finally:
+            self.release()
+
+    def record(self, memory: Memory, started_at: float) -> None:
+        with self._condition:
+            # Downloads started before the last cut saw the old limit, skip them
+            if started_at < self._last_decrease_at:
+                return
+            if RetryPolicy.is_transient(memory.error_code):
+                self._decrease(f"error {memory.error_code}")
+                return
+
+            self._epoch_downloads += 1
+            self._epoch_latency += memory.response_seconds
+            self._epoch_bytes += memory.download_bytes
+            if self._epoch_downloads >= self.limit:
+                self._close_epoch()
+
+    def _close_epoch(self) -> None:
+        elapsed = max(perf_counter() - self._epoch_started_at, 1e-9)
+        throughput = self._epoch_bytes / elapsed
+        latency = self._epoch_latency / self._epoch_downloads
+        if self._baseline_latency is None or latency < self._baseline_latency:
+            self._baseline_latency = latency
+
+        if latency > LATENCY_TOLERANCE * self._baseline_latency:
+            self._decrease(f"latency {latency:.2f}s")
+            return
+        if throughput >= THROUGHPUT_TOLERANCE * self._last_throughput:
+            self._set_limit(self.limit + 1, f"throughput {throughput / 1e6:.1f} MB/s")
+        self._last_throughput = throughput
+        self._start_epoch()
+
+    def _decrease(self, reason: str) -> None:
+        self._last_decrease_at = perf_counter()
+        self._last_throughput = 0.0
+        self._set_limit(int(self.limit * DECREASE_FACTOR), reason)
+        self._start_epoch()
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        limit = max(self.minimum, min(limit, self.maximum))
+        if limit == self.limit:
+            return
+        log(f"Concurrency {self.limit} -> {limit} ({reason})", "info")
+        self.limit = limit
+        self._condition.notify_all()
+
+    def _start_epoch(self) -> None:
+        self._epoch_started_at = perf_counter()
+        self._epoch_downloads = 0
+        self._epoch_bytes = 0
+        self._epoch_latency = 0.0
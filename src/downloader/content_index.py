@@ -0,0 +1,49 @@
+from pathlib import Path
+from threading import Event, Lock
+
+from src.memories import Memory
+
+
+class _Entry:
+    def __init__(self) -> None:
+        self.ready = Event()
+        self.memory: Memory | None = None
+        self.output_path: Path | None = None
+
+
+class ContentIndex:
+    # Maps the SHA-256 of a downloaded body to the output it was processed into
+    def __init__(self) -> None:
+        self._entries: dict[str, _Entry] = {}
+        self._lock = Lock()
+
+    def claim(self, digest: str) -> tuple[Memory, Path] | None:
+        # None means the caller owns the digest and must publish its result,
+        # otherwise this waits for the owner and returns its memory and output
+        while True:
+            with self._lock:
+                entry = self._entries.get(digest)
+                if entry is None:
+                    self._entries[digest] = _Entry()
+                    return None
+            entry.ready.wait()
+            if entry.output_path is None:
+                # The owner failed and already dropped the entry
+                continue
+            if entry.output_path.exists():
+                return entry.memory, entry.output_path
+            with self._lock:
+                # The published output is gone, the first to notice takes over
+                if self._entries.get(digest) is entry:
+                    self._entries[digest] = _Entry()
+                    return None
+
+    def publish(self, digest: str, memory: Memory, output_path: Path | None) -> None:
+        with self._lock:
+            entry = self._entries[digest]
+            if output_path is None:
+                # Let the next copy try processing on its own
+                del self._entries[digest]
+        entry.memory = memory
+        entry.output_path = output_path
+        entry.ready.set()
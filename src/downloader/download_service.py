@@ -1,51 +1,100 @@
+from collections.abc import Mapping
+from hashlib import sha256
+from io import BytesIO
 from pathlib import Path
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, BinaryIO
 
-from requests import Response, Session, adapters
+from requests import Response, Session
 
-from src import FileNameResolver
+from src import FileNameResolver, OutputLayout
 from src.config import Config
+from src.downloader.http_session import HttpSession
+from src.downloader.part_file import PartFile
+from src.downloader.rate_limiter import RateLimiter
 from src.logger import log
-from src.media_dispatcher import process_media
 from src.memories import Memory
 
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+RANGE_NOT_SATISFIABLE = 416
+# Statuses whose Retry-After header pauses every download, not just this one
+THROTTLING_STATUSES = {429, 503}
+
 
 class DownloadService:
     def __init__(self, memory: Memory) -> None:
         self.memory = memory
 
-    def run(self) -> tuple[bool, str | None]:
-        file_path = None
-
-        response = self._download_memory()
-        if response.status_code >= 400:
-            self._log_fetch_failure(response.status_code)
-            return None, False
-
-        self.memory.is_zip = self._is_zip_response(response)
-
-        file_path = self._store_downloaded_memory(response)
-        file_path = process_media(self.memory, file_path)
-
-        return file_path, True
-
-    def _download_memory(self) -> Response:
+    def run(self) -> tuple[Path | BinaryIO | None, bool]:
+        part_file = PartFile(self.memory)
+        self.memory.download_bytes = 0
+        if part_file.is_finished():
+            file_path = self._promote_finished_part(part_file)
+            return file_path, file_path is not None
+
+        started_at = perf_counter()
+        response = self._download_memory(self._request_headers(part_file))
+        self.memory.response_seconds = perf_counter() - started_at
+        with response:
+            if response.status_code >= 400:
+                self._handle_fetch_failure(
+                    response.status_code, response.headers, part_file
+                )
+                return None, False
+
+            if not part_file.accepts(response.status_code, response.headers):
+                self._handle_range_mismatch(part_file)
+                return None, False
+
+            self.memory.is_zip = self._is_zip_response(response, part_file)
+            if self._keeps_zip_in_memory(response.headers, part_file):
+                file_path = self._store_zip_in_memory(response)
+            else:
+                file_path = self._store_downloaded_memory(response, part_file)
+
+        return file_path, file_path is not None
+
+    def _download_memory(self, headers: dict[str, str]) -> Response:
         timeout = Config.cli_options["request_timeout"]
-        return self._build_session().get(
+        return self._get_session().get(
             self.memory.media_download_url,
+            headers=headers,
             timeout=timeout,
         )
 
-    def _build_session(self) -> Session:
-        http_session = Session()
-        adapter = self._create_http_adapter()
-        http_session.mount("https://", adapter)
-        return http_session
-
-    def _create_http_adapter(self) -> adapters.HTTPAdapter:
-        max_concurrent = Config.cli_options["max_concurrent_downloads"]
-        return adapters.HTTPAdapter(
-            pool_connections=max_concurrent,
-            pool_maxsize=max_concurrent * 2,
+    @staticmethod
+    def _request_headers(part_file: PartFile) -> dict[str, str]:
+        # Sizes and Range offsets are compared against the bytes on the wire,
+        # a transparently decompressed body would never match them
+        return {"Accept-Encoding": "identity", **part_file.resume_headers()}
+
+    @staticmethod
+    def _get_session() -> Session:
+        return HttpSession.get()
+
+    def _handle_fetch_failure(
+        self, status_code: int, headers: Mapping[str, str], part_file: PartFile
+    ) -> None:
+        self.memory.error_code = str(status_code)
+        if status_code in THROTTLING_STATUSES and RateLimiter.honor_retry_after(
+            headers, self.memory.filename_with_ext
+        ):
+            self.memory.throttled_attempts += 1
+        if status_code == RANGE_NOT_SATISFIABLE:
+            # Stored offset no longer fits the remote file, next attempt starts over
+            part_file.discard()
+            self.memory.error_code = "DL"
+        self._log_fetch_failure(status_code)
+
+    def _handle_range_mismatch(self, part_file: PartFile) -> None:
+        self.memory.error_code = "DL"
+        part_file.discard()
+        log(
+            f"Server resumed {self.memory.filename_with_ext} at the wrong offset, "
+            "discarding partial download",
+            "warning",
         )
 
     def _log_fetch_failure(self, status_code: int) -> None:
@@ -53,17 +102,91 @@ class DownloadService:
         log(f"Failed to download {file_name}", "error", status_code)
 
     @staticmethod
-    def _is_zip_response(response: Response) -> bool:
-        content_type = response.headers.get("Content-Type", "")
+    def _is_zip_response(response: Response, part_file: PartFile) -> bool:
+        # Fall back to the type recorded for the first request of a resumed file
+        content_type = response.headers.get("Content-Type") or part_file.content_type
         return content_type.lower() == "application/zip"
 
-    def _store_downloaded_memory(self, download_response: Response) -> Path:
-        file_path = Config.downloads_folder / self.memory.filename_with_ext
+    def _store_downloaded_memory(
+        self, download_response: Response, part_file: PartFile
+    ) -> Path | None:
+        digest = part_file.start_digest(download_response.status_code)
+        with part_file.open_for(
+            download_response.status_code, download_response.headers
+        ) as f:
+            self._copy_body(download_response, f, digest)
+        return self._finalize_part_file(part_file)
+
+    def _keeps_zip_in_memory(
+        self, headers: Mapping[str, str], part_file: PartFile
+    ) -> bool:
+        # Archives are unpacked right after the download, so small ones can skip
+        # the disk entirely. A started .part file keeps resuming on disk instead.
+        if not self.memory.is_zip or part_file.size > 0:
+            return False
+        limit = Config.cli_options["zip_memory_limit"]
+        if limit == 0:
+            return False
+        # Without an announced size the archive could be any size, so it goes
+        # to a resumable .part file like any other download
+        content_length = headers.get("Content-Length")
+        return content_length is not None and int(content_length) <= limit
+
+    def _store_zip_in_memory(self, download_response: Response) -> BinaryIO | None:
+        buffer = self._open_zip_buffer()
+        self._copy_body(download_response, buffer, sha256())
+        return self._finalize_zip_buffer(buffer, download_response.headers)
+
+    def _copy_body(
+        self, download_response: Response, sink: BinaryIO, digest: "_Hash"
+    ) -> None:
+        # The one chunk loop of this engine, for .part files and buffers alike
+        chunk_size = Config.cli_options["stream_chunk_size"]
+        for chunk in download_response.iter_content(chunk_size=chunk_size):
+            sink.write(chunk)
+            digest.update(chunk)
+            self.memory.download_bytes += len(chunk)
+            if delay := RateLimiter.bytes_delay(len(chunk)):
+                sleep(delay)
+        self.memory.content_digest = digest.hexdigest()
 
-        if file_path.exists():
-            file_path = FileNameResolver(file_path).run()
-
-        with Path.open(file_path, "wb") as f:
-            f.write(download_response.content)
-
-        return file_path
+    @staticmethod
+    def _open_zip_buffer() -> BinaryIO:
+        # Only archives with a known size under the limit get here
+        return BytesIO()
+
+    def _finalize_zip_buffer(
+        self, buffer: BinaryIO, headers: Mapping[str, str]
+    ) -> BinaryIO | None:
+        content_length = headers.get("Content-Length")
+        if content_length is not None and buffer.tell() != int(content_length):
+            self.memory.error_code = "DL"
+            log(
+                f"Download of {self.memory.filename_with_ext} ended early "
+                f"after {buffer.tell()} bytes",
+                "warning",
+            )
+            buffer.close()
+            return None
+        buffer.seek(0)
+        return buffer
+
+    def _promote_finished_part(self, part_file: PartFile) -> Path | None:
+        # A Range request for a complete .part file would only be answered 416
+        self.memory.is_zip = part_file.content_type.lower() == "application/zip"
+        self.memory.content_digest = part_file.hash_kept_bytes().hexdigest()
+        return self._finalize_part_file(part_file)
+
+    def _finalize_part_file(self, part_file: PartFile) -> Path | None:
+        if not part_file.is_complete():
+            # Keep the .part file so the next attempt can resume from here
+            self.memory.error_code = "DL"
+            log(
+                f"Download of {self.memory.filename_with_ext} ended early "
+                f"after {part_file.size} bytes",
+                "warning",
+            )
+            return None
+
+        file_path = OutputLayout.folder_for(self.memory) / self.memory.filename_with_ext
+        return part_file.promote(FileNameResolver(file_path).run())
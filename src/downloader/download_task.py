@@ -1,6 +1,10 @@
 from pathlib import Path
+from typing import BinaryIO
+
+from aiohttp import ClientSession
 
 from src.config import Config
+from src.downloader.async_download_service import AsyncDownloadService
 from src.downloader.download_service import DownloadService
 from src.logger import log
 from src.memories import Memory
@@ -10,17 +14,26 @@ class DownloadTask:
     def __init__(self, memory: Memory) -> None:
         self.memory = memory
 
-    def run(self) -> tuple[Path, bool]:
+    def run(self) -> tuple[Path | BinaryIO | None, bool]:
         if not self._ensure_strict_location():
             return None, False
 
         return DownloadService(self.memory).run()
 
+    async def run_async(
+        self, http_session: ClientSession
+    ) -> tuple[Path | BinaryIO | None, bool]:
+        if not self._ensure_strict_location():
+            return None, False
+
+        return await AsyncDownloadService(self.memory, http_session).run()
+
     def _ensure_strict_location(self) -> bool:
         if (
             Config.cli_options["strict_location"]
             and self.memory.location_coords is None
         ):
+            self.memory.error_code = "LOC"
             log(
                 f"Skipping {self.memory.filename_with_ext}: No location data available",
                 "warning",
@@ -1,67 +1,232 @@
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from threading import Event, Lock, Timer
+from typing import BinaryIO
 
+from requests import RequestException
+
+from src import FileNameResolver, OutputLayout
 from src.config import Config
+from src.converters import CjxlPool
+from src.downloader.concurrency_controller import ConcurrencyController
 from src.downloader.download_task import DownloadTask
+from src.downloader.http_session import HttpSession
+from src.downloader.processing_stage import ProcessingStage
+from src.downloader.rate_limiter import RateLimiter
+from src.downloader.retry_policy import RetryPolicy
+from src.downloader.stage_meter import StageMeter
 from src.logger import log
-from src.memories import MemoriesRepository, Memory
+from src.media_dispatcher import CpuPool
+from src.memories import MemoriesRepository, Memory, StateStore
+from src.overlay import OverlayCache
 from src.ui import StatsManager, UpdateUI
 
+SUBMIT_WINDOW_PER_WORKER = 4
+
 
 class MemoryDownloader:
     def run(self) -> None:
-        future_download_tasks = self._gather_future_download_tasks()
+        self.state_store = StateStore.open_configured()
+        self.processing_stage = ProcessingStage()
+        try:
+            self._run_stages()
+        finally:
+            self.processing_stage.close()
+            CpuPool.close()
+            CjxlPool.close()
+            HttpSession.close()
+            RateLimiter.close()
+            FileNameResolver.reset()
+            OutputLayout.reset()
+            OverlayCache.close()
+            self._close_state()
 
-        if not future_download_tasks:
-            log("No items to download.", "info")
-            return
+    def _run_stages(self) -> None:
+        self._submitted_count = 0
+        self._collected_count = 0
+        self._all_submitted = False
+        self._stopping = Event()
+        self.retry_policy = RetryPolicy()
+        self.concurrency = ConcurrencyController.from_config()
 
         try:
-            self._execute_downloads(future_download_tasks)
+            self._execute_downloads()
         except KeyboardInterrupt:
-            self._handle_keyboard_interrupt(future_download_tasks)
+            self._handle_keyboard_interrupt()
 
-    def _execute_downloads(self, tasks: dict[Future, tuple[int, Memory]]) -> None:
-        for future in as_completed(tasks):
-            _, memory = tasks[future]
-            file_path, download_succeeded = future.result()
-            self._check_for_success(download_succeeded, memory, file_path)
+        if self._submitted_count == 0:
+            log("No items to download.", "info")
+            return
+        self._log_stage_utilization()
+        self._log_overlay_cache()
 
-    def _handle_keyboard_interrupt(
-        self, tasks: dict[Future, tuple[int, Memory]]
-    ) -> None:
+    def _execute_downloads(self) -> None:
+        max_workers = Config.cli_options["max_concurrent_downloads"]
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.download_meter = StageMeter(max_workers)
+        self._in_flight: set[Future] = set()
+        # Memories waiting out a retry backoff, keyed by id(memory)
+        self._pending_retries: dict[int, tuple[Timer, Memory]] = {}
+        self._retry_lock = Lock()
+        window = self._submit_window()
+
+        for memory in self._gather_download_tasks():
+            # Only a window of memories is alive at once, however big the export
+            while self._submitted_count - self._collected_count >= window:
+                self._collect_next_result()
+            self._submit_download(memory)
+            self._submitted_count += 1
+
+        self._all_submitted = True
+        self._collect_results()
+
+    def _submit_download(self, memory: Memory) -> None:
+        future = self._executor.submit(self._download_and_hand_over, memory)
+        self._in_flight.add(future)
+        future.add_done_callback(self._in_flight.discard)
+
+    @staticmethod
+    def _submit_window() -> int:
+        max_workers = Config.cli_options["max_concurrent_downloads"]
+        return max_workers * SUBMIT_WINDOW_PER_WORKER
+
+    def _collect_results(self) -> None:
+        # Every memory yields exactly one result, from whichever stage finished it
+        while not self._all_submitted or self._collected_count < self._submitted_count:
+            self._collect_next_result()
+
+    def _collect_next_result(self) -> None:
+        result = self.processing_stage.results.get()
+        if result is None:
+            return
+        memory, file_path, succeeded = result
+        self._collected_count += 1
+        self._check_for_success(succeeded, memory, file_path)
+
+    def _handle_keyboard_interrupt(self) -> None:
         log("KeyboardInterrupt received. Converting last files before exit...", "info")
         UpdateUI().run("interrupted")
-        unfinished = [f for f in tasks if not f.done()]
-        unfinished_dict = {f: tasks[f] for f in unfinished}
-        self._execute_downloads(unfinished_dict)
+        self._stopping.set()
+        self._cancel_queued_downloads()
+        self._collect_results()
         log("All running downloads/conversions finished. Exiting.", "info")
 
-    def _gather_future_download_tasks(self) -> dict[Future, tuple[int, Memory]]:
-        download_tasks = self._gather_download_tasks()
-        max_workers = Config.cli_options["max_concurrent_downloads"]
-        executor = ThreadPoolExecutor(max_workers=max_workers)
+    def _cancel_queued_downloads(self) -> None:
+        self._all_submitted = True
+        # Taken first, so no retry is resubmitted after the queue is cancelled
+        with self._retry_lock:
+            pending_retries = list(self._pending_retries.values())
+            self._pending_retries.clear()
+        cancelled = [future for future in list(self._in_flight) if future.cancel()]
+        self._submitted_count -= len(cancelled)
+        for timer, memory in pending_retries:
+            timer.cancel()
+            # Failures go straight to the results queue, never the processing one
+            self.processing_stage.hand_over(memory, None, False)
 
-        # Use dictonary becaude otherwsie index gets lost in 'as_completed'
-        futures = {}
+    def _download_and_hand_over(self, memory: Memory) -> None:
+        file_path, download_succeeded = None, False
+        retry_scheduled = False
+        try:
+            file_path, download_succeeded = self._download_once(memory)
+            retry_scheduled = not download_succeeded and self._schedule_retry(memory)
+        finally:
+            if not retry_scheduled:
+                self.processing_stage.hand_over(memory, file_path, download_succeeded)
 
-        for index, memory in enumerate(download_tasks):
-            future = executor.submit(DownloadTask(memory).run)
-            futures[future] = (index, memory)
+    def _schedule_retry(self, memory: Memory) -> bool:
+        backoff = self._plan_retry(memory)
+        if backoff is None:
+            return False
+        # The pool thread goes back to downloading, a timer resubmits the memory
+        timer = Timer(backoff, self._resubmit_retry, (memory,))
+        timer.daemon = True
+        with self._retry_lock:
+            # Ctrl+C already swept the pending retries, this one fails right away
+            if self._stopping.is_set():
+                return False
+            self._pending_retries[id(memory)] = (timer, memory)
+            timer.start()
+        return True
 
-        return futures
+    def _resubmit_retry(self, memory: Memory) -> None:
+        with self._retry_lock:
+            if self._pending_retries.pop(id(memory), None) is None:
+                return
+            self._submit_download(memory)
 
-    @staticmethod
-    def _gather_download_tasks() -> list[Memory]:
-        download_tasks = []
-        raw_memory_items = MemoriesRepository().get_raw_items()
-        StatsManager.total_files = len(raw_memory_items)
+    def _download_once(self, memory: Memory) -> tuple[Path | BinaryIO | None, bool]:
+        memory.attempts += 1
+        memory.error_code = None
+        # Rate limits and Retry-After pauses are waited out before taking a slot
+        delay = RateLimiter.request_delay()
+        if delay and self._stopping.wait(delay):
+            memory.error_code = "INT"
+            return None, False
 
-        for item in raw_memory_items:
-            memory = Memory.model_validate(item)
-            download_tasks.append(memory)
+        file_path, download_succeeded = None, False
+        with self.concurrency.slot() as started_at:
+            try:
+                with self.download_meter.busy() as timing:
+                    file_path, download_succeeded = DownloadTask(memory).run()
+                memory.download_seconds = timing.seconds
+            except RequestException as e:
+                log(
+                    f"Failed to download {memory.filename_with_ext}: {e}",
+                    "error",
+                    "NET",
+                )
+                memory.error_code = "NET"
+            except Exception as e:
+                # Anything else, like a failed write, would vanish with the future
+                log(
+                    f"Failed to download {memory.filename_with_ext}: {e}",
+                    "error",
+                    "FILE",
+                )
+                memory.error_code = "FILE"
+                file_path, download_succeeded = None, False
+            self.concurrency.record(memory, started_at)
+        return file_path, download_succeeded
 
-        return download_tasks
+    def _plan_retry(self, memory: Memory) -> float | None:
+        if self._stopping.is_set() or not self.retry_policy.should_retry(memory):
+            return None
+        backoff = self.retry_policy.backoff_seconds(memory.attempts)
+        log(
+            f"Retrying {memory.filename_with_ext} in {backoff:.1f}s after error "
+            f"{memory.error_code} (attempt {memory.attempts + 1} / "
+            f"{self.retry_policy.max_attempts})",
+            "info",
+        )
+        return backoff
+
+    def _close_state(self) -> None:
+        if self.state_store is None:
+            MemoriesRepository.compact()
+        else:
+            self.state_store.close()
+
+    def _gather_download_tasks(self) -> Iterator[Memory]:
+        if self.state_store is not None:
+            yield from self._gather_pending_from_state_store()
+            return
+
+        # Items are validated as they are parsed, so downloads start right away
+        StatsManager.total_files = MemoriesRepository.count_raw_items()
+        parsed_count = 0
+        for item in MemoriesRepository().iter_raw_items():
+            parsed_count += 1
+            StatsManager.total_files = max(StatsManager.total_files, parsed_count)
+            yield Memory.model_validate(item)
+        # The scan is an estimate, the parsed count is exact
+        StatsManager.total_files = parsed_count
+
+    def _gather_pending_from_state_store(self) -> Iterator[Memory]:
+        self.state_store.sync_from_json()
+        StatsManager.total_files = self.state_store.count_pending()
+        return self.state_store.iter_pending()
 
     def _check_for_success(
         self,
@@ -69,6 +234,15 @@ class MemoryDownloader:
         memory: Memory,
         file_path: Path,
     ) -> None:
+        if self.state_store is not None:
+            self.state_store.record_result(memory, file_path, download_succeeded)
+        StatsManager.retried_count += max(memory.attempts - 1, 0)
+        if memory.overlay_cache_hit is not None:
+            if memory.overlay_cache_hit:
+                StatsManager.overlay_cache_hits += 1
+            else:
+                StatsManager.overlay_cache_misses += 1
+
         if download_succeeded:
             self._download_succeeded(memory, file_path)
         else:
@@ -83,11 +257,13 @@ class MemoryDownloader:
 
     def _prune_memory_item(self, memory: Memory, file_path: Path) -> None:
         file_size_mb = self._convert_file_size(file_path)
-        MemoriesRepository().prune_by_media_download_url(memory.media_download_url)
+        # With a state store the database is the record, the JSON stays untouched
+        if self.state_store is None:
+            MemoriesRepository().prune_by_media_download_url(memory.media_download_url)
         log(
             f"Downloaded item {memory.filename_with_ext}. \
             File size: {file_size_mb:.2f} MB. \
-            Successfully pruned from json.",
+            Recorded as completed.",
             "info",
         )
 
@@ -95,7 +271,32 @@ class MemoryDownloader:
     def _convert_file_size(file_path: Path) -> float:
         return file_path.stat().st_size / (1024 * 1024)
 
-    @staticmethod
-    def _log_processed_indices(indices: set[int]) -> None:
+    def _log_processed_indices(self, indices: set[int]) -> None:
         if indices and len(indices) % 10 == 0:
-            log(f"Successfully processed {len(indices)} items so far", "debug")
+            log(
+                f"Successfully processed {len(indices)} items so far, "
+                f"{self.processing_stage.queue_depth} waiting for processing",
+                "debug",
+            )
+
+    def _log_stage_utilization(self) -> None:
+        stage = self.processing_stage
+        log(
+            f"Stage utilization: download {self.download_meter.utilization:.0%} "
+            f"of {self.download_meter.workers} workers, processing "
+            f"{stage.meter.utilization:.0%} of {stage.meter.workers} workers, "
+            f"peak queue depth {stage.peak_queue_depth}/{stage.queue_capacity}",
+            "info",
+        )
+
+    @staticmethod
+    def _log_overlay_cache() -> None:
+        hits = StatsManager.overlay_cache_hits
+        misses = StatsManager.overlay_cache_misses
+        if hits + misses == 0:
+            return
+        log(
+            f"Overlay cache: {hits} hits, {misses} misses "
+            f"({hits / (hits + misses):.0%} reused)",
+            "info",
+        )
@@ -0,0 +1,70 @@
+from threading import Lock
+
+from requests import Session, adapters
+
+from src.config import Config
+from src.logger import log
+
+
+class HttpSession:
+    _session: Session | None = None
+    _lock = Lock()
+
+    @classmethod
+    def get(cls) -> Session:
+        # Shared by every worker so connections to the CDN stay alive between files
+        with cls._lock:
+            if cls._session is None:
+                cls._session = cls._build_session()
+            return cls._session
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            if cls._session is None:
+                return
+            cls._log_connection_reuse(cls._session)
+            cls._session.close()
+            cls._session = None
+
+    @classmethod
+    def _build_session(cls) -> Session:
+        http_session = Session()
+        # Bodies are read chunk by chunk so large videos never sit fully in RAM
+        http_session.stream = True
+        adapter = cls._create_http_adapter()
+        http_session.mount("https://", adapter)
+        http_session.mount("http://", adapter)
+        return http_session
+
+    @staticmethod
+    def _create_http_adapter() -> adapters.HTTPAdapter:
+        max_concurrent = Config.cli_options["max_concurrent_downloads"]
+        return adapters.HTTPAdapter(
+            pool_connections=max_concurrent,
+            pool_maxsize=max_concurrent * 2,
+        )
+
+    @classmethod
+    def _log_connection_reuse(cls, http_session: Session) -> None:
+        requests_count, connections_count = cls._collect_pool_counters(http_session)
+        if requests_count == 0:
+            return
+        reused = requests_count - connections_count
+        log(
+            f"HTTP connection reuse: {requests_count} requests over "
+            f"{connections_count} connections ({reused / requests_count:.0%} reused)",
+            "info",
+        )
+
+    @staticmethod
+    def _collect_pool_counters(http_session: Session) -> tuple[int, int]:
+        requests_count = 0
+        connections_count = 0
+        adapter = http_session.get_adapter("https://")
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():  # noqa: SIM118 - RecentlyUsedContainer has no iter
+            pool = pools[key]
+            requests_count += pool.num_requests
+            connections_count += pool.num_connections
+        return requests_count, connections_count
@@ -0,0 +1,117 @@
+import json
+from collections.abc import Mapping
+from hashlib import sha256
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from src.config import Config
+from src.memories import Memory
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+PARTIAL_CONTENT = 206
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class PartFile:
+    def __init__(self, memory: Memory) -> None:
+        # Keyed by URL so a retry finds the same partial file again
+        url_digest = sha256(memory.media_download_url.encode("utf-8")).hexdigest()
+        part_name = f"{memory.filename}_{url_digest[:12]}.part"
+        self.path = Config.downloads_folder / part_name
+        self.validators_path = self.path.parent / f"{part_name}.json"
+
+    @property
+    def size(self) -> int:
+        if not self.path.exists():
+            return 0
+        return self.path.stat().st_size
+
+    @property
+    def content_type(self) -> str:
+        return self._load_validators().get("content_type", "")
+
+    def resume_headers(self) -> dict[str, str]:
+        if self.size == 0:
+            return {}
+
+        headers = {"Range": f"bytes={self.size}-"}
+        etag = self._load_validators().get("etag")
+        if etag:
+            # Server sends the full body instead if the file changed meanwhile
+            headers["If-Range"] = etag
+        return headers
+
+    def accepts(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        if status_code != PARTIAL_CONTENT:
+            return True
+        return self._content_range_start(headers) == self.size
+
+    def open_for(self, status_code: int, headers: Mapping[str, str]) -> BinaryIO:
+        if status_code == PARTIAL_CONTENT:
+            return Path.open(self.path, "ab")
+
+        # Server ignored the Range header, so start over from byte zero
+        self._save_validators(headers)
+        return Path.open(self.path, "wb")
+
+    def start_digest(self, status_code: int) -> "_Hash":
+        # A resumed body only covers the tail, so the kept bytes are hashed first
+        if status_code == PARTIAL_CONTENT:
+            return self.hash_kept_bytes()
+        return sha256()
+
+    def hash_kept_bytes(self) -> "_Hash":
+        digest = sha256()
+        if self.path.exists():
+            with Path.open(self.path, "rb") as f:
+                while block := f.read(HASH_BLOCK_SIZE):
+                    digest.update(block)
+        return digest
+
+    def is_complete(self) -> bool:
+        expected_size = self._load_validators().get("content_length")
+        return expected_size is None or self.size == expected_size
+
+    def is_finished(self) -> bool:
+        # Every announced byte is on disk already, e.g. after a crash between
+        # the last write and the rename
+        expected_size = self._load_validators().get("content_length")
+        return (
+            expected_size is not None
+            and self.path.exists()
+            and self.size == expected_size
+        )
+
+    def promote(self, final_path: Path) -> Path:
+        self.path.replace(final_path)
+        self.validators_path.unlink(missing_ok=True)
+        return final_path
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.validators_path.unlink(missing_ok=True)
+
+    def _save_validators(self, headers: Mapping[str, str]) -> None:
+        content_length = headers.get("Content-Length")
+        validators = {
+            "etag": headers.get("ETag"),
+            "content_length": int(content_length) if content_length else None,
+            "content_type": headers.get("Content-Type", ""),
+        }
+        self.validators_path.write_text(json.dumps(validators), encoding="utf-8")
+
+    def _load_validators(self) -> dict:
+        if not self.validators_path.exists():
+            return {}
+        return json.loads(self.validators_path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _content_range_start(headers: Mapping[str, str]) -> int | None:
+        # Header value looks like "bytes 6-9/10" for a resumed transfer
+        content_range = headers.get("Content-Range", "")
+        if not content_range.startswith("bytes "):
+            return None
+        start = content_range.removeprefix("bytes ").split("-", 1)[0]
+        return int(start) if start.isdigit() else None
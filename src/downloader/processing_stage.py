@@ -0,0 +1,104 @@
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+from typing import BinaryIO
+
+from src.config import Config
+from src.downloader.content_index import ContentIndex
+from src.downloader.stage_meter import StageMeter
+from src.logger import log
+from src.media_dispatcher import link_duplicate, process_media
+from src.memories import Memory
+
+QUEUE_SLOTS_PER_WORKER = 2
+_STOP = None
+
+
+class ProcessingStage:
+    def __init__(self) -> None:
+        workers = Config.cli_options["processing_workers"]
+        self.queue_capacity = workers * QUEUE_SLOTS_PER_WORKER
+        self.peak_queue_depth = 0
+        self.meter = StageMeter(workers)
+        self.content_index = ContentIndex()
+        self.results: Queue[tuple[Memory, Path | None, bool] | None] = Queue()
+        self._queue: Queue[tuple[Memory, Path | BinaryIO] | None] = Queue(
+            maxsize=self.queue_capacity
+        )
+        self._workers = [
+            Thread(target=self._work, name=f"process-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def hand_over(
+        self,
+        memory: Memory,
+        file_path: Path | BinaryIO | None,
+        download_succeeded: bool,
+    ) -> None:
+        if not download_succeeded:
+            self.results.put((memory, None, False))
+            return
+
+        # Blocks the download worker while processing is behind
+        self._queue.put((memory, file_path))
+        self.peak_queue_depth = max(self.peak_queue_depth, self._queue.qsize())
+
+    def wake_collector(self) -> None:
+        # Lets the result loop re-check its exit condition after the last hand-over
+        self.results.put(None)
+
+    def close(self) -> None:
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def _work(self) -> None:
+        while (item := self._queue.get()) is not _STOP:
+            memory, file_path = item
+            self.results.put(self._process(memory, file_path))
+
+    def _process(
+        self, memory: Memory, file_path: Path | BinaryIO
+    ) -> tuple[Memory, Path | None, bool]:
+        # Catch everything, a worker that dies here would stall the whole run
+        try:
+            with self.meter.busy() as timing:
+                processed_path = self._process_or_link(memory, file_path)
+        except Exception as e:
+            log(f"Failed to process {memory.filename_with_ext}: {e}", "error", "FILE")
+            memory.error_code = "FILE"
+            return memory, None, False
+        memory.processing_seconds = timing.seconds
+        return memory, processed_path, True
+
+    def _process_or_link(self, memory: Memory, file_path: Path | BinaryIO) -> Path:
+        digest = memory.content_digest
+        if digest is None:
+            return process_media(memory, file_path)
+
+        original = self.content_index.claim(digest)
+        if original is None:
+            processed_path = None
+            try:
+                processed_path = process_media(memory, file_path)
+            finally:
+                self.content_index.publish(digest, memory, processed_path)
+            return processed_path
+
+        linked_path = link_duplicate(memory, file_path, *original)
+        if linked_path is None:
+            return process_media(memory, file_path)
+        log(
+            f"{memory.filename_with_ext} is a copy of {original[1].name}, "
+            "skipped processing",
+            "info",
+        )
+        return linked_path
@@ -0,0 +1,110 @@
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic
+
+from src.config import Config
+from src.logger import log
+
+# A misbehaving header must not park the whole run for hours
+MAX_RETRY_AFTER_SECONDS = 300.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = monotonic()
+
+    def reserve(self, amount: float) -> float:
+        # Tokens may go negative, the caller then waits until the debt is repaid
+        now = monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+        self._tokens -= amount
+        return max(-self._tokens / self.rate, 0.0)
+
+
+class RateLimiter:
+    _requests: TokenBucket | None = None
+    _bytes: TokenBucket | None = None
+    _configured = False
+    _paused_until = 0.0
+    _lock = Lock()
+
+    @classmethod
+    def request_delay(cls) -> float:
+        # Seconds to wait before the next request, shared by every download
+        with cls._lock:
+            cls._configure()
+            delay = max(cls._paused_until - monotonic(), 0.0)
+            if cls._requests is not None:
+                delay = max(delay, cls._requests.reserve(1))
+            return delay
+
+    @classmethod
+    def bytes_delay(cls, size: int) -> float:
+        with cls._lock:
+            cls._configure()
+            if cls._bytes is None:
+                return 0.0
+            return cls._bytes.reserve(size)
+
+    @classmethod
+    def honor_retry_after(cls, headers: Mapping[str, str], file_name: str) -> bool:
+        seconds = parse_retry_after(headers.get("Retry-After"))
+        if seconds is None:
+            return False
+        seconds = min(seconds, MAX_RETRY_AFTER_SECONDS)
+        with cls._lock:
+            paused_until = monotonic() + seconds
+            if paused_until <= cls._paused_until:
+                return True
+            cls._paused_until = paused_until
+        log(
+            f"Server asked to retry {file_name} after {seconds:.0f}s, "
+            "pausing new downloads",
+            "warning",
+        )
+        return True
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            cls._requests = None
+            cls._bytes = None
+            cls._configured = False
+            cls._paused_until = 0.0
+
+    @classmethod
+    def _configure(cls) -> None:
+        if cls._configured:
+            return
+        requests_per_second = Config.cli_options["rate_limit"]
+        if requests_per_second:
+            # Up to one second of requests may go out back to back
+            cls._requests = TokenBucket(
+                requests_per_second, max(requests_per_second, 1.0)
+            )
+        bytes_per_second = Config.cli_options["bandwidth_limit"]
+        if bytes_per_second:
+            cls._bytes = TokenBucket(bytes_per_second, bytes_per_second)
+        cls._configured = True
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    # Either delay-seconds or an HTTP date, see RFC 9110 section 10.2.3
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,37 @@
+import random
+
+from src.config import Config
+from src.memories import Memory
+
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+# Rate limits, timeouts, dropped connections and truncated bodies usually pass.
+# 401/403/404/410 mean the link is dead, so retrying only wastes time.
+TRANSIENT_ERROR_CODES = {"408", "429", "NET", "DL"}
+# Attempts answered with Retry-After do not count against --attempts, up to here
+MAX_THROTTLED_ATTEMPTS = 10
+
+
+class RetryPolicy:
+    def __init__(self) -> None:
+        self.max_attempts = Config.cli_options["max_attempts"]
+
+    def should_retry(self, memory: Memory) -> bool:
+        counted_attempts = memory.attempts - memory.throttled_attempts
+        return (
+            counted_attempts < self.max_attempts
+            and memory.throttled_attempts <= MAX_THROTTLED_ATTEMPTS
+            and self.is_transient(memory.error_code)
+        )
+
+    @staticmethod
+    def is_transient(error_code: str | None) -> bool:
+        if error_code in TRANSIENT_ERROR_CODES:
+            return True
+        return bool(error_code and error_code.isdigit() and error_code[0] == "5")
+
+    @staticmethod
+    def backoff_seconds(attempt: int) -> float:
+        # Exponential with jitter, so items that failed together spread out again
+        ceiling = min(BASE_BACKOFF_SECONDS * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+        return random.uniform(ceiling / 2, ceiling)
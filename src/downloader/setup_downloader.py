@@ -1,4 +1,5 @@
 from src.config import Config
+from src.downloader.async_downloader import AsyncMemoryDownloader
 from src.downloader.downloader import MemoryDownloader
 from src.logger import log
 from src.ui import Display, StatsManager
@@ -6,23 +7,27 @@ from src.ui import Display, StatsManager
 
 class SetupDownloader:
     def run(self) -> None:
-        max_attempts = Config.cli_options["max_attempts"]
-
-        for attempt in range(max_attempts):
-            Display().print_display("loading")
-            log(f"Starting attempt {attempt + 1} / {max_attempts}...", "info")
-            StatsManager.new_attempt()
-            MemoryDownloader().run()
-
-            if not self._check_for_failures():
-                break
+        # Failed items are retried individually inside the run, see RetryPolicy
+        Display().print_display("loading")
+        StatsManager.new_attempt()
+        self._create_downloader().run()
+        self._log_summary()
 
-        if StatsManager.failed_downloads_count > 0:
-            log(f"Max attempts ({max_attempts}) reached with failures", "info")
+    @staticmethod
+    def _create_downloader() -> MemoryDownloader:
+        if Config.cli_options["download_engine"] == "async":
+            return AsyncMemoryDownloader()
+        return MemoryDownloader()
 
     @staticmethod
-    def _check_for_failures() -> bool:
+    def _log_summary() -> None:
+        retries = StatsManager.retried_count
         if StatsManager.failed_downloads_count == 0:
-            log("All downloads successful, no retry needed", "info")
-            return False
-        return True
+            log(f"All downloads successful after {retries} retries", "info")
+            return
+        max_attempts = Config.cli_options["max_attempts"]
+        log(
+            f"{StatsManager.failed_downloads_count} downloads failed "
+            f"(up to {max_attempts} attempts each, {retries} retries)",
+            "info",
+        )
@@ -0,0 +1,34 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+
+class BusyTiming:
+    seconds = 0.0
+
+
+class StageMeter:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._busy_seconds = 0.0
+        self._started_at = perf_counter()
+        self._lock = Lock()
+
+    @contextmanager
+    def busy(self) -> Iterator[BusyTiming]:
+        timing = BusyTiming()
+        started_at = perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.seconds = perf_counter() - started_at
+            with self._lock:
+                self._busy_seconds += timing.seconds
+
+    @property
+    def utilization(self) -> float:
+        capacity = (perf_counter() - self._started_at) * self.workers
+        if capacity <= 0:
+            return 0.0
+        return min(self._busy_seconds / capacity, 1.0)
@@ -1,26 +1,60 @@
+import os
 from pathlib import Path
+from threading import Lock
+from typing import ClassVar
 
 
 class FileNameResolver:
+    # Names handed out per directory, seeded from disk once so collisions are
+    # resolved without listing the folder again
+    _reserved: ClassVar[dict[Path, set[str]]] = {}
+    # Next _N suffix to try per requested path, keeps repeated names O(1)
+    _next_index: ClassVar[dict[Path, int]] = {}
+    _lock = Lock()
+
     def __init__(self, path: Path) -> None:
         self.path = path
 
     def run(self) -> Path:
-        used_names = [path.name for path in self.path.parent.iterdir()]
-        candidate = self._next_available(used_names)
-        used_names.append(candidate.name)
-        return candidate
+        # Reserves the returned name, so concurrent workers never get the same one
+        with self._lock:
+            used_names = self._used_names(self.path.parent)
+            candidate = self._next_available(used_names)
+            used_names.add(candidate.name)
+            return candidate
 
-    def _next_available(self, used_names: list[str]) -> Path:
-        candidate = self.path
-        index = 1
-        while self._is_used(candidate.name, used_names):
-            candidate = self._with_index(index)
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._reserved.clear()
+            cls._next_index.clear()
+
+    @classmethod
+    def _used_names(cls, directory: Path) -> set[str]:
+        used_names = cls._reserved.get(directory)
+        if used_names is None:
+            used_names = cls._scan(directory)
+            cls._reserved[directory] = used_names
+        return used_names
+
+    @staticmethod
+    def _scan(directory: Path) -> set[str]:
+        if not directory.is_dir():
+            return set()
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+
+    def _next_available(self, used_names: set[str]) -> Path:
+        if self.path.name not in used_names:
+            return self.path
+
+        index = self._next_index.get(self.path, 1)
+        candidate = self._with_index(index)
+        while candidate.name in used_names:
             index += 1
+            candidate = self._with_index(index)
+        self._next_index[self.path] = index + 1
         return candidate
 
-    def _is_used(self, candidate_name: str, used_names: list[str]) -> bool:
-        return candidate_name in used_names
-
     def _with_index(self, index: int) -> Path:
         return self.path.parent / f"{self.path.stem}_{index}{self.path.suffix}"
@@ -1,6 +1,15 @@
+from src.media_dispatcher.cpu_pool import CpuPool
+from src.media_dispatcher.duplicate_linker import link_duplicate
 from src.media_dispatcher.image_processor import process_image
 from src.media_dispatcher.media_dispatcher import process_media
 from src.media_dispatcher.video_processor import ProcessVideo
 from src.media_dispatcher.zip_processor import ZipProcessor
 
-__all__ = ["ProcessVideo", "ZipProcessor", "process_image", "process_media"]
+__all__ = [
+    "CpuPool",
+    "ProcessVideo",
+    "ZipProcessor",
+    "link_duplicate",
+    "process_image",
+    "process_media",
+]
@@ -0,0 +1,52 @@
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import TypeVar
+
+from src.config import Config
+
+T = TypeVar("T")
+
+
+def _configure_worker(cli_options: dict) -> None:
+    # Spawned workers start with a fresh Config, so copy the parsed options over
+    Config.cli_options = cli_options
+
+
+class CpuPool:
+    _executor: ProcessPoolExecutor | None = None
+    _lock = Lock()
+
+    @classmethod
+    def run(cls, function: Callable[..., T], *args: object) -> T:
+        # Image decode/encode holds the GIL, so it runs in worker processes
+        if not cls.uses_workers():
+            return function(*args)
+        return cls._get().submit(function, *args).result()
+
+    @staticmethod
+    def uses_workers() -> bool:
+        # Arguments and results are pickled only when this is True
+        return Config.cli_options["cpu_workers"] > 0
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            if cls._executor is None:
+                return
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+
+    @classmethod
+    def _get(cls) -> ProcessPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=Config.cli_options["cpu_workers"],
+                    # Forking a process that runs download threads can deadlock
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_configure_worker,
+                    initargs=(Config.cli_options,),
+                )
+            return cls._executor
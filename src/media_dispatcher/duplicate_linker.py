@@ -0,0 +1,72 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+from src import FileNameResolver, OutputLayout
+from src.config import Config
+from src.media_dispatcher.cpu_pool import CpuPool
+from src.media_dispatcher.image_processor import write_image_metadata
+from src.memories import Memory
+from src.metadata import VideoMetadataWriter
+
+# Outputs whose metadata can be rewritten without running the pipeline again
+RETAGGABLE_SUFFIXES = {".jpg", ".mp4"}
+
+
+def link_duplicate(
+    memory: Memory, file_path: Path | BinaryIO, original: Memory, original_path: Path
+) -> Path | None:
+    # None means the copy still needs the full pipeline
+    same_metadata = _same_metadata(memory, original)
+    if not same_metadata and original_path.suffix not in RETAGGABLE_SUFFIXES:
+        return None
+
+    output_path = _output_path(memory, file_path, original_path.suffix)
+    if output_path == original_path:
+        # Linking or copying a file onto itself would lose the original
+        return None
+    if isinstance(file_path, Path):
+        file_path.unlink()
+    else:
+        file_path.close()
+
+    if same_metadata:
+        _hardlink(original_path, output_path)
+        return output_path
+
+    shutil.copyfile(original_path, output_path)
+    if original_path.suffix == ".jpg":
+        CpuPool.run(write_image_metadata, memory, output_path)
+        return output_path
+    return VideoMetadataWriter(memory, output_path).write_video_metadata()
+
+
+def _output_path(memory: Memory, file_path: Path | BinaryIO, suffix: str) -> Path:
+    if not isinstance(file_path, Path):
+        folder = OutputLayout.folder_for(memory)
+        return FileNameResolver(folder / f"{memory.filename}{suffix}").run()
+
+    # The download's name is already reserved and the file is deleted right
+    # after, so its stem is reused instead of asking for a new _N name
+    output_path = file_path.with_suffix(suffix)
+    if output_path == file_path:
+        return output_path
+    return FileNameResolver(output_path).run()
+
+
+def _same_metadata(memory: Memory, original: Memory) -> bool:
+    if not Config.cli_options["write_metadata"]:
+        return True
+    return (
+        memory.exif_datetime == original.exif_datetime
+        and memory.location_coords == original.location_coords
+    )
+
+
+def _hardlink(original_path: Path, output_path: Path) -> None:
+    try:
+        os.link(original_path, output_path)
+    except OSError:
+        # Filesystems without hardlinks (FAT, some network shares) get a copy
+        shutil.copyfile(original_path, output_path)
@@ -2,6 +2,7 @@ from pathlib import Path
 
 from src.config import Config
 from src.converters import JXLConverter
+from src.media_dispatcher.cpu_pool import CpuPool
 from src.memories import Memory
 from src.metadata import ImageMetadataWriter
 
@@ -11,9 +12,21 @@ def process_image(memory: Memory, file_path: Path) -> Path:
     write_metadata = Config.cli_options["write_metadata"]
 
     if write_metadata:
-        ImageMetadataWriter(memory, file_path).write_image_metadata()
+        CpuPool.run(write_image_metadata, memory, file_path)
 
     if convert_to_jxl:
         file_path = JXLConverter(file_path).run()
 
     return file_path
+
+
+def write_image_metadata(memory: Memory, file_path: Path) -> None:
+    ImageMetadataWriter(memory, file_path).write_image_metadata()
+
+
+def save_composed_image(jpeg_bytes: bytes, output_path: Path) -> Path:
+    # The composed JPEG already carries its EXIF, it is only written or converted
+    if Config.cli_options["convert_to_jxl"]:
+        return JXLConverter(output_path).run_from_bytes(jpeg_bytes)
+    output_path.write_bytes(jpeg_bytes)
+    return output_path
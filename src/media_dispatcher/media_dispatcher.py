@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import BinaryIO
 
 from src.media_dispatcher.image_processor import process_image
 from src.media_dispatcher.video_processor import ProcessVideo
@@ -6,7 +7,7 @@ from src.media_dispatcher.zip_processor import ZipProcessor
 from src.memories import Memory
 
 
-def process_media(memory: Memory, file_path: Path) -> Path:
+def process_media(memory: Memory, file_path: Path | BinaryIO) -> Path:
     if memory.is_zip:
         return ZipProcessor(memory, file_path).run()
     if memory.media_type == "Image":
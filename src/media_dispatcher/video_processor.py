@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import BinaryIO
 
 from src.config import Config
 from src.converters import VideoConverter
@@ -7,14 +8,28 @@ from src.metadata import VideoMetadataWriter
 
 
 class ProcessVideo:
-    def run(self, memory: Memory, file_path: Path) -> Path:
-        if Config.cli_options["write_metadata"]:
-            return VideoMetadataWriter(memory, file_path).write_video_metadata()
+    def run(
+        self,
+        memory: Memory,
+        file_path: Path,
+        overlay_path: Path | None = None,
+        source: Path | BinaryIO | None = None,
+    ) -> Path:
+        # source is read instead of file_path when the video isn't on disk yet
+        write_metadata = Config.cli_options["write_metadata"]
+        metadata_writer = VideoMetadataWriter(memory, file_path)
 
-        if self._should_process_video():
-            file_path = VideoConverter(file_path).run()
+        if source is None and overlay_path is None and not self._should_process_video():
+            if write_metadata:
+                # Nothing to re-encode, a stream copy is enough for the tags
+                return metadata_writer.write_video_metadata()
+            return file_path
 
-        return file_path
+        # Overlay, encoder settings and tags go into a single ffmpeg pass
+        metadata_arguments = (
+            metadata_writer.ffmpeg_metadata_arguments() if write_metadata else []
+        )
+        return VideoConverter(file_path, overlay_path, metadata_arguments, source).run()
 
     def _should_process_video(self) -> bool:
         return bool(
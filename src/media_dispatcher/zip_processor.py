@@ -1,49 +1,141 @@
 from pathlib import Path
+from typing import BinaryIO
 
+from src import FileNameResolver, OutputLayout
 from src import ZipProcessor as CoreZipProcessor
 from src.config import Config
-from src.media_dispatcher.image_processor import process_image
+from src.converters import JXLConverter
+from src.media_dispatcher.cpu_pool import CpuPool
+from src.media_dispatcher.image_processor import process_image, save_composed_image
 from src.media_dispatcher.video_processor import ProcessVideo
 from src.memories import Memory
+from src.metadata import ImageMetadataWriter
 from src.overlay import ImageComposer, VideoComposer
+from src.overlay.scratch_file import write_scratch_file
 
 
 class ZipProcessor:
-    def __init__(self, memory: Memory, file_path: Path) -> None:
+    def __init__(self, memory: Memory, file_path: Path | BinaryIO) -> None:
         self.memory = memory
+        # Small archives arrive as an in-memory buffer, large ones as a file
         self.file_path = file_path
 
     def run(self) -> Path:
         apply_overlay = Config.cli_options["apply_overlay"]
-        content, overlay, extention = CoreZipProcessor(
-            self.file_path,
-        ).extract_media_from_zip()
-        output_path = self.file_path.with_suffix(extention)
-        self.file_path.unlink()
+        archive = self._open_archive()
+        composed_image = None
+        try:
+            extention = CoreZipProcessor(archive).media_extension()
+            output_path = self._output_path(extention)
 
-        if apply_overlay:
-            self._apply_overlay(content, overlay, extention, output_path)
-        else:
-            self._bytes_to_path(content, output_path)
+            if apply_overlay and extention == ".jpg" and CpuPool.uses_workers():
+                return self._compose_image_in_worker(archive, output_path)
+            if apply_overlay and extention == ".jpg":
+                composed_image = self._compose_image(archive)
+            elif apply_overlay:
+                # ffmpeg reads the video while the archive is still open
+                return self._apply_overlay(archive, output_path)
+            else:
+                CoreZipProcessor(archive).extract_media_to(output_path)
+        finally:
+            self._discard_archive(archive)
 
+        if composed_image is not None:
+            return save_composed_image(composed_image, output_path)
         if extention == ".jpg":
             return process_image(self.memory, output_path)
-
         return ProcessVideo().run(self.memory, output_path)
 
-    def _apply_overlay(
-        self,
-        content: bytes,
-        overlay: bytes,
-        extention: str,
-        output_path: Path,
-    ) -> None:
-        if extention == ".jpg":
-            ImageComposer(content, overlay, output_path).apply_overlay()
-        else:
-            VideoComposer(content, overlay, output_path).apply_overlay()
+    def _open_archive(self) -> Path | BinaryIO:
+        if not isinstance(self.file_path, Path):
+            return self.file_path
+        # The output may reuse the download's name, so move the archive aside
+        zip_path = FileNameResolver(self.file_path.with_suffix(".zip")).run()
+        self.file_path.replace(zip_path)
+        return zip_path
+
+    def _output_path(self, extention: str) -> Path:
+        if not isinstance(self.file_path, Path):
+            folder = OutputLayout.folder_for(self.memory)
+            return FileNameResolver(folder / f"{self.memory.filename}{extention}").run()
+
+        output_path = self.file_path.with_suffix(extention)
+        if output_path == self.file_path:
+            # The archive moved aside, so the download's own name is free to reuse
+            return output_path
+        return FileNameResolver(output_path).run()
+
+    def _compose_image(self, archive: Path | BinaryIO) -> bytes:
+        # Runs in this thread, the JPEG can go on to cjxl without touching disk
+        memory = self.memory if Config.cli_options["write_metadata"] else None
+        jpeg_bytes, self.memory.overlay_cache_hit = compose_zipped_image(
+            archive, memory
+        )
+        return jpeg_bytes
+
+    def _compose_image_in_worker(
+        self, archive: Path | BinaryIO, output_path: Path
+    ) -> Path:
+        # Multi-MB archives and images are never pickled, the worker gets paths
+        # and writes the JPEG itself. A buffered archive is spilled first.
+        memory = self.memory if Config.cli_options["write_metadata"] else None
+        job_archive = archive
+        if not isinstance(archive, Path):
+            archive.seek(0)
+            job_archive = write_scratch_file(".zip", archive)
+        try:
+            self.memory.overlay_cache_hit = CpuPool.run(
+                write_composed_image, job_archive, memory, output_path
+            )
+        finally:
+            if job_archive is not archive:
+                job_archive.unlink()
+        if Config.cli_options["convert_to_jxl"]:
+            return JXLConverter(output_path).run()
+        return output_path
+
+    def _apply_overlay(self, archive: Path | BinaryIO, output_path: Path) -> Path:
+        overlay = CoreZipProcessor(archive).read_overlay()
+        if overlay is None:
+            CoreZipProcessor(archive).extract_media_to(output_path)
+            return ProcessVideo().run(self.memory, output_path)
+
+        # The video goes from the archive into the ffmpeg pass that also draws
+        # the overlay, encodes and tags, output_path is only written once
+        with CoreZipProcessor(archive).open_media() as media:
+            composer = VideoComposer(media, overlay)
+            with composer.prepare() as (video_source, overlay_path):
+                self.memory.overlay_cache_hit = composer.cache_hit
+                return ProcessVideo().run(
+                    self.memory, output_path, overlay_path, video_source
+                )
 
     @staticmethod
-    def _bytes_to_path(bytes_content: bytes, output_path: Path) -> Path:
-        with Path.open(output_path, "wb") as file:
-            file.write(bytes_content)
+    def _discard_archive(archive: Path | BinaryIO) -> None:
+        if isinstance(archive, Path):
+            archive.unlink()
+        else:
+            archive.close()
+
+
+def compose_zipped_image(
+    archive: Path | BinaryIO, memory: Memory | None
+) -> tuple[bytes, bool]:
+    # Decode, composite and tag, then encode only once
+    content, overlay, _ = CoreZipProcessor(archive).extract_media_from_zip()
+    exif_bytes = None
+    if memory is not None:
+        exif_bytes = ImageMetadataWriter(memory).exif_bytes()
+    composer = ImageComposer(content, overlay)
+    jpeg_bytes = composer.apply_overlay(exif_bytes)
+    # The worker's cache hit goes back with the image, stats live in the parent
+    return jpeg_bytes, composer.cache_hit
+
+
+def write_composed_image(
+    archive: Path, memory: Memory | None, output_path: Path
+) -> bool:
+    # Runs in a CpuPool worker, only paths and the cache hit cross the process
+    jpeg_bytes, cache_hit = compose_zipped_image(archive, memory)
+    output_path.write_bytes(jpeg_bytes)
+    return cache_hit
@@ -1,4 +1,5 @@
 from src.memories.memories_repository import MemoriesRepository
 from src.memories.memory_model import Memory
+from src.memories.state_store import StateStore
 
-__all__ = ["MemoriesRepository", "Memory"]
+__all__ = ["MemoriesRepository", "Memory", "StateStore"]
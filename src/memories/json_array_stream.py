@@ -0,0 +1,98 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+READ_CHUNK_CHARS = 64 * 1024
+WHITESPACE = " \t\n\r"
+NUMBER_CHARACTERS = "0123456789+-.eE"
+
+
+class JsonArrayStream:
+    def __init__(self, path: Path, key: str) -> None:
+        self.path = path
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._at_eof = False
+
+    def __iter__(self) -> Iterator:
+        # Only the array under `key` in the top-level object is streamed item by
+        # item, everything else is decoded and dropped
+        with Path.open(self.path, encoding="utf-8") as file:
+            self._reset()
+            self._expect(file, "{")
+            while not self._consume_if(file, "}"):
+                key = self._next_value(file)
+                self._expect(file, ":")
+                if key == self.key:
+                    yield from self._iter_array(file)
+                    return
+                self._next_value(file)
+                self._consume_if(file, ",")
+
+    def _iter_array(self, file: TextIO) -> Iterator:
+        self._expect(file, "[")
+        while not self._consume_if(file, "]"):
+            yield self._next_value(file)
+            self._consume_if(file, ",")
+
+    def _reset(self) -> None:
+        self._buffer = ""
+        self._position = 0
+        self._at_eof = False
+
+    def _next_value(self, file: TextIO) -> object:
+        while True:
+            self._skip_whitespace(file)
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._at_eof:
+                    raise
+                self._read_more(file)
+                continue
+            if self._may_continue(end):
+                self._read_more(file)
+                continue
+            self._position = end
+            return value
+
+    def _may_continue(self, end: int) -> bool:
+        # A number cut off by the chunk boundary still decodes, just shorter
+        if self._at_eof:
+            return False
+        index = end
+        while index < len(self._buffer) and self._buffer[index] in NUMBER_CHARACTERS:
+            index += 1
+        return index == len(self._buffer)
+
+    def _expect(self, file: TextIO, character: str) -> None:
+        if not self._consume_if(file, character):
+            message = f"Expecting '{character}'"
+            raise json.JSONDecodeError(message, self._buffer, self._position)
+
+    def _consume_if(self, file: TextIO, character: str) -> bool:
+        self._skip_whitespace(file)
+        if self._buffer.startswith(character, self._position):
+            self._position += 1
+            return True
+        return False
+
+    def _skip_whitespace(self, file: TextIO) -> None:
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer) or self._at_eof:
+                return
+            self._read_more(file)
+
+    def _read_more(self, file: TextIO) -> None:
+        chunk = file.read(READ_CHUNK_CHARS)
+        self._at_eof = not chunk
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
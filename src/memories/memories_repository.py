@@ -1,17 +1,62 @@
 import json
+from collections.abc import Iterator
 from pathlib import Path
+from threading import Lock
 
 from src.config import Config
 from src.logger import log
+from src.memories.json_array_stream import JsonArrayStream
+
+JOURNAL_COMPACT_INTERVAL = 500
+COUNT_CHUNK_BYTES = 1024 * 1024
+ITEM_KEY = b'"Media Download Url"'
 
 
 class MemoriesRepository:
+    _journal_lock = Lock()
+    _journal_entries = 0
+    _open_streams = 0
+    _compaction_deferred = False
+
     def get_raw_items(self) -> list[dict]:
-        data = self._load()
-        if not data:
-            return []
+        return list(self.iter_raw_items())
+
+    @classmethod
+    def iter_raw_items(cls) -> Iterator[dict]:
+        # Fold completions left over from an interrupted run into the JSON first
+        cls.compact()
+        if not Config.json_path.exists():
+            log(f"Memories JSON file not found at {Config.json_path}", "error", "MISS")
+            return
+
+        with cls._journal_lock:
+            cls._open_streams += 1
+        try:
+            yield from JsonArrayStream(Config.json_path, "Saved Media")
+        finally:
+            with cls._journal_lock:
+                cls._open_streams -= 1
+                compact_now = cls._compaction_deferred and not cls._open_streams
+            if compact_now:
+                cls.compact()
 
-        return data.get("Saved Media", [])
+    @classmethod
+    def count_raw_items(cls) -> int:
+        # A byte scan for the one key every item has, far cheaper than parsing,
+        # so progress and ETA have a total before the first item is streamed
+        cls.compact()
+        if not Config.json_path.exists():
+            return 0
+
+        count = 0
+        tail = b""
+        with Path.open(Config.json_path, "rb") as file:
+            while chunk := file.read(COUNT_CHUNK_BYTES):
+                data = tail + chunk
+                count += data.count(ITEM_KEY)
+                # Keep a partial key from the end of this chunk, not a whole one
+                tail = data[-(len(ITEM_KEY) - 1) :]
+        return count
 
     @staticmethod
     def _load() -> dict:
@@ -22,21 +67,79 @@ class MemoriesRepository:
         with Path.open(Config.json_path, encoding="utf-8") as file:
             return json.load(file)
 
-    def prune_by_media_download_url(self, media_download_url: str) -> None:
-        data = self._load()
+    @classmethod
+    def prune_by_media_download_url(cls, media_download_url: str) -> None:
+        # Appending is O(1), the JSON itself is only rewritten on compaction
+        with cls._journal_lock:
+            with Path.open(cls._journal_path(), "a", encoding="utf-8") as journal:
+                journal.write(json.dumps(media_download_url) + "\n")
+            cls._journal_entries += 1
+            should_compact = cls._journal_entries >= JOURNAL_COMPACT_INTERVAL
+
+        if should_compact:
+            cls.compact()
+
+    @classmethod
+    def compact(cls) -> None:
+        with cls._journal_lock:
+            if cls._open_streams:
+                # The JSON is still being streamed, it cannot be replaced under
+                # the open file on Windows, so this waits for the stream to end
+                cls._compaction_deferred = True
+                return
+            cls._compaction_deferred = False
+            completed_urls = cls._read_journal()
+            if not completed_urls:
+                return
+
+            data = cls._load()
+            if data:
+                cls._remove_completed(data, completed_urls)
+                cls._save(data)
+
+            # Replaying a journal that outlived its compaction is harmless
+            cls._journal_path().unlink()
+            cls._journal_entries = 0
+
+    @staticmethod
+    def _remove_completed(data: dict, completed_urls: set[str]) -> None:
         saved_media = data.get("Saved Media", [])
-        for index, item in enumerate(saved_media):
-            if item.get("Media Download Url") != media_download_url:
-                continue
-            del saved_media[index]
-            self._save(data)
-            return
-        log(
-            f"Media Download Url {media_download_url} not found for pruning.",
-            "warning",
-        )
+        remaining = [
+            item
+            for item in saved_media
+            if item.get("Media Download Url") not in completed_urls
+        ]
+        pruned_count = len(saved_media) - len(remaining)
+        if pruned_count < len(completed_urls):
+            log(
+                f"{len(completed_urls) - pruned_count} completed Media Download Urls "
+                "not found for pruning.",
+                "warning",
+            )
+        data["Saved Media"] = remaining
+
+    @staticmethod
+    def _journal_path() -> Path:
+        return Config.json_path.with_name(f"{Config.json_path.stem}.journal")
+
+    @classmethod
+    def _read_journal(cls) -> set[str]:
+        journal_path = cls._journal_path()
+        if not journal_path.exists():
+            return set()
+
+        completed_urls = set()
+        with Path.open(journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                # A crash mid-append can leave a last line without its newline
+                if line.endswith("\n"):
+                    completed_urls.add(json.loads(line))
+        return completed_urls
 
     @staticmethod
     def _save(data: dict) -> None:
         text = json.dumps(data, ensure_ascii=False, indent=4)
-        Config.json_path.write_text(text, encoding="utf-8")
+        temp_path = Config.json_path.with_name(f"{Config.json_path.name}.tmp")
+        temp_path.write_text(text, encoding="utf-8")
+        # Rename is atomic, so a crash never leaves a half-written JSON behind
+        temp_path.replace(Config.json_path)
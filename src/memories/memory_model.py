@@ -9,6 +9,15 @@ class Memory(BaseModel):
     media_type: str = Field(alias="Media Type")
     location: str | None = Field(default=None, alias="Location")
     is_zip: bool = False
+    content_digest: str | None = None
+    error_code: str | None = None
+    attempts: int = 0
+    throttled_attempts: int = 0
+    response_seconds: float = 0.0
+    download_bytes: int = 0
+    download_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    overlay_cache_hit: bool | None = None
 
     exif_datetime: str = ""
     video_creation_time: str = ""
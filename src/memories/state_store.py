@@ -0,0 +1,125 @@
+import json
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+from threading import Lock
+
+from src.config import Config
+from src.memories.memories_repository import MemoriesRepository
+from src.memories.memory_model import Memory
+
+PENDING_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    media_download_url TEXT PRIMARY KEY,
+    raw_item TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    output_path TEXT,
+    size_bytes INTEGER,
+    download_seconds REAL,
+    processing_seconds REAL,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS memories_status ON memories (status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class StateStore:
+    def __init__(self, db_path: Path) -> None:
+        # Results are recorded from the main thread, the lock guards the rest
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def open_configured(cls) -> "StateStore | None":
+        db_path = Config.cli_options["state_db"]
+        if db_path is None:
+            return None
+        return cls(db_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def sync_from_json(self) -> None:
+        # Only a new or re-exported JSON is parsed, restarts read the database
+        if not Config.json_path.exists():
+            return
+        json_mtime = str(Config.json_path.stat().st_mtime_ns)
+        if self._get_meta("json_mtime") == json_mtime:
+            return
+
+        rows = (
+            (item["Media Download Url"], json.dumps(item, ensure_ascii=False))
+            for item in MemoriesRepository().iter_raw_items()
+        )
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO memories (media_download_url, raw_item) "
+                "VALUES (?, ?)",
+                rows,
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_mtime', ?)",
+                (str(Config.json_path.stat().st_mtime_ns),),
+            )
+
+    def count_pending(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM memories WHERE status != 'done'"
+            ).fetchone()
+        return count
+
+    def iter_pending(self, batch_size: int = PENDING_BATCH_SIZE) -> Iterator[Memory]:
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT rowid, raw_item FROM memories "
+                    "WHERE status != 'done' AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for _, raw_item in rows:
+                yield Memory.model_validate(json.loads(raw_item))
+            last_rowid = rows[-1][0]
+
+    def record_result(
+        self, memory: Memory, file_path: Path | None, succeeded: bool
+    ) -> None:
+        size_bytes = file_path.stat().st_size if succeeded else None
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE memories SET status = ?, attempts = attempts + ?, "
+                "last_error = ?, output_path = ?, size_bytes = ?, "
+                "download_seconds = ?, processing_seconds = ?, "
+                "updated_at = datetime('now') WHERE media_download_url = ?",
+                (
+                    "done" if succeeded else "failed",
+                    max(memory.attempts, 1),
+                    None if succeeded else memory.error_code or "ERR",
+                    str(file_path) if succeeded else None,
+                    size_bytes,
+                    memory.download_seconds,
+                    memory.processing_seconds,
+                    memory.media_download_url,
+                ),
+            )
+
+    def _get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
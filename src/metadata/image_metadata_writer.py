@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import piexif
+from piexif import InvalidImageDataError
 from PIL import Image
 
 from src.config import Config
@@ -8,16 +9,19 @@ from src.memories import Memory
 
 
 class ImageMetadataWriter:
-    def __init__(self, memory: Memory, file_path: Path) -> None:
+    def __init__(self, memory: Memory, file_path: Path | None = None) -> None:
         self.memory = memory
         self.file_path = file_path
 
         self.exif_metadata = {"0th": {}, "Exif": {}, "GPS": {}}
 
     def write_image_metadata(self) -> None:
+        self._save_image_with_exif()
+
+    def exif_bytes(self) -> bytes:
         self._set_datetime_fields()
         self._set_gps_fields()
-        self._save_image_with_exif()
+        return piexif.dump(self.exif_metadata)
 
     def _set_datetime_fields(self) -> None:
         datetime_bytes = self.memory.exif_datetime.encode("utf-8")
@@ -71,8 +75,15 @@ class ImageMetadataWriter:
         )
 
     def _save_image_with_exif(self) -> None:
+        exif_data_bytes = self.exif_bytes()
+        try:
+            # Swaps the APP1 segment in place, the compressed pixels stay untouched
+            piexif.insert(exif_data_bytes, str(self.file_path))
+        except InvalidImageDataError:
+            self._reencode_with_exif(exif_data_bytes)
+
+    def _reencode_with_exif(self, exif_data_bytes: bytes) -> None:
+        # Not a JPEG stream, so there is no segment to splice into
         quality = Config.cli_options["jpeg_quality"]
-        exif_data_bytes = piexif.dump(self.exif_metadata)
-
         with Image.open(self.file_path) as image:
             image.save(str(self.file_path), exif=exif_data_bytes, quality=quality)
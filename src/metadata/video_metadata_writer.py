@@ -33,7 +33,7 @@ class VideoMetadataWriter:
         return self.file_path
 
     def _build_ffmpeg_command(self, temporary_video_path: Path) -> list[str]:
-        metadata_arguments = self._ffmpeg_metadata_arguments()
+        metadata_arguments = self.ffmpeg_metadata_arguments()
 
         return [
             get_ffmpeg_exe(),
@@ -45,7 +45,7 @@ class VideoMetadataWriter:
             str(temporary_video_path),
         ]
 
-    def _ffmpeg_metadata_arguments(self) -> list[str]:
+    def ffmpeg_metadata_arguments(self) -> list[str]:
         meta_args = ["-metadata", f"creation_time={self.memory.video_creation_time}"]
 
         if self.memory.location_coords:
@@ -0,0 +1,39 @@
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar
+
+from src.config import Config
+
+if TYPE_CHECKING:
+    from src.memories import Memory
+
+
+class OutputLayout:
+    # Folders known to exist, so each one is created once per run
+    _created: ClassVar[set[Path]] = set()
+    _lock = Lock()
+
+    @classmethod
+    def folder_for(cls, memory: "Memory") -> Path:
+        # Memory.date looks like "2023-12-05 12:34:56 UTC"
+        layout = Config.cli_options["output_layout"]
+        folder = Config.downloads_folder
+        if layout in {"year", "month"}:
+            folder /= memory.date[:4]
+        if layout == "month":
+            folder /= memory.date[5:7]
+        cls._ensure(folder)
+        return folder
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._created.clear()
+
+    @classmethod
+    def _ensure(cls, folder: Path) -> None:
+        if folder in cls._created:
+            return
+        with cls._lock:
+            folder.mkdir(parents=True, exist_ok=True)
+            cls._created.add(folder)
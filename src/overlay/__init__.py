@@ -1,4 +1,5 @@
 from src.overlay.image_composer import ImageComposer
+from src.overlay.overlay_cache import OverlayCache
 from src.overlay.video_composer import VideoComposer
 
-__all__ = ["ImageComposer", "VideoComposer"]
+__all__ = ["ImageComposer", "OverlayCache", "VideoComposer"]
@@ -1,45 +1,39 @@
 from io import BytesIO
-from pathlib import Path
 
 from PIL import Image
 
 from src.config import Config
+from src.overlay.overlay_cache import OverlayCache
 
 
 class ImageComposer:
-    def __init__(
-        self, image_bytes: bytes, overlay_bytes: bytes, output_path: Path
-    ) -> None:
+    def __init__(self, image_bytes: bytes, overlay_bytes: bytes) -> None:
         self.image_bytes = image_bytes
         self.overlay_bytes = overlay_bytes
-        self.output_path = output_path
+        self.cache_hit = False
 
-    def apply_overlay(self) -> bytes:
+    def apply_overlay(self, exif_bytes: bytes | None = None) -> bytes:
         base_image = Image.open(BytesIO(self.image_bytes))
-        overlay_image = Image.open(BytesIO(self.overlay_bytes))
-        base_image = self._ensure_rgba(base_image)
-        overlay_image = self._ensure_rgba(overlay_image)
-
-        # In some cases the overlay image is mismatched by 1 pixel
-        overlay_image = self._resize_to_match(overlay_image, base_image.size)
-
-        combined_image = Image.alpha_composite(base_image, overlay_image)
-        combined_rgb_image = combined_image.convert("RGB")
-
+        base_image = self._ensure_rgb(base_image)
+        visible_overlay, offset, self.cache_hit = OverlayCache.visible_region(
+            self.overlay_bytes, base_image.size
+        )
+        if visible_overlay is not None:
+            # The photo is opaque, so blending with the overlay's alpha as the
+            # paste mask matches alpha_composite, just over the visible box
+            base_image.paste(visible_overlay, offset, mask=visible_overlay)
+
+        # The only encode of the composed image, EXIF goes in with it
         quality = Config.cli_options["jpeg_quality"]
-        combined_rgb_image.save(str(self.output_path), format="JPEG", quality=quality)
-
-    @staticmethod
-    def _ensure_rgba(image: Image.Image) -> Image.Image:
-        if image.mode != "RGBA":
-            return image.convert("RGBA")
-        return image
+        save_options = {"quality": quality}
+        if exif_bytes is not None:
+            save_options["exif"] = exif_bytes
+        output = BytesIO()
+        base_image.save(output, format="JPEG", **save_options)
+        return output.getvalue()
 
     @staticmethod
-    def _resize_to_match(
-        image: Image.Image,
-        target_size: tuple[int, int],
-    ) -> Image.Image:
-        if image.size != target_size:
-            return image.resize(target_size, Image.Resampling.LANCZOS)
+    def _ensure_rgb(image: Image.Image) -> Image.Image:
+        if image.mode != "RGB":
+            return image.convert("RGB")
         return image
@@ -0,0 +1,176 @@
+import os
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+# A moov box this large means something is off, the file goes to disk instead
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+
+
+def read_faststart_header(stream: BinaryIO) -> bytes | None:
+    # Top-level boxes up to the end of moov. None when mdat comes first, a
+    # demuxer reading a pipe would then have to seek back for the index
+    header = bytearray()
+    while True:
+        box_header = stream.read(8)
+        if len(box_header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", box_header)
+        if box_type == b"mdat":
+            return None
+
+        large_size = b""
+        if size == 1:
+            large_size = stream.read(8)
+            if len(large_size) < 8:
+                return None
+            size = struct.unpack(">Q", large_size)[0]
+        body_size = size - len(box_header) - len(large_size)
+        # size 0 means the box runs to the end of the file
+        if body_size < 0 or len(header) + size > MAX_HEADER_BYTES:
+            return None
+
+        body = stream.read(body_size)
+        if len(body) < body_size:
+            return None
+        header += box_header + large_size + body
+        if box_type == b"moov":
+            return bytes(header)
+
+
+def read_moov(stream: BinaryIO) -> bytes | None:
+    # Finds moov wherever it is, skipping mdat, so the stream must be seekable
+    while True:
+        box_header = stream.read(8)
+        if len(box_header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", box_header)
+
+        large_size = b""
+        if size == 1:
+            large_size = stream.read(8)
+            if len(large_size) < 8:
+                return None
+            size = struct.unpack(">Q", large_size)[0]
+        body_size = size - len(box_header) - len(large_size)
+        if body_size < 0:
+            return None
+
+        if box_type != b"moov":
+            stream.seek(body_size, os.SEEK_CUR)
+            continue
+        if size > MAX_HEADER_BYTES:
+            return None
+        body = stream.read(body_size)
+        if len(body) < body_size:
+            return None
+        return box_header + large_size + body
+
+
+@dataclass(frozen=True)
+class VideoInfo:
+    width: int
+    height: int
+    duration: float
+    codec: str
+
+
+def probe_video(header: bytes) -> VideoInfo | None:
+    # Reads the first video track from a moov box, or from bytes that contain one
+    moov = _find_box(header, b"moov", 0, len(header))
+    if moov is None:
+        return None
+    moov_start, moov_end = moov
+
+    duration = 0.0
+    mvhd = _find_box(header, b"mvhd", moov_start, moov_end)
+    if mvhd is not None:
+        duration = _read_duration(header, mvhd[0])
+
+    for trak_start, trak_end in _iter_boxes(header, b"trak", moov_start, moov_end):
+        mdia = _find_box(header, b"mdia", trak_start, trak_end)
+        if mdia is None or _handler_type(header, *mdia) != b"vide":
+            continue
+        tkhd = _find_box(header, b"tkhd", trak_start, trak_end)
+        if tkhd is None:
+            return None
+        width, height = _read_track_size(header, tkhd[0])
+        if not width or not height:
+            return None
+        return VideoInfo(width, height, duration, _codec(header, *mdia))
+    return None
+
+
+def _iter_boxes(
+    data: bytes, box_type: bytes, start: int, end: int
+) -> Iterator[tuple[int, int]]:
+    # Yields (body_start, body_end) of the direct children of that type
+    offset = start
+    while offset + 8 <= end:
+        size, child_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            return
+        if child_type == box_type:
+            yield offset + header_size, offset + size
+        offset += size
+
+
+def _find_box(
+    data: bytes, box_type: bytes, start: int, end: int
+) -> tuple[int, int] | None:
+    return next(_iter_boxes(data, box_type, start, end), None)
+
+
+def _find_path(data: bytes, path: list[bytes], start: int, end: int) -> int | None:
+    for box_type in path:
+        box = _find_box(data, box_type, start, end)
+        if box is None:
+            return None
+        start, end = box
+    return start
+
+
+def _read_duration(data: bytes, mvhd_start: int) -> float:
+    if data[mvhd_start] == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, mvhd_start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, mvhd_start + 12)
+    return duration / timescale if timescale else 0.0
+
+
+def _read_track_size(data: bytes, tkhd_start: int) -> tuple[int, int]:
+    matrix_start = tkhd_start + (52 if data[tkhd_start] == 1 else 40)
+    if matrix_start + 44 > len(data):
+        return 0, 0
+    a, _, _, _, d = struct.unpack_from(">5i", data, matrix_start)
+    # 16.16 fixed point, the integer part is enough for sizing an overlay
+    width, height = struct.unpack_from(">II", data, matrix_start + 36)
+    width, height = width >> 16, height >> 16
+    if a == 0 and d == 0:
+        # Rotated by 90 or 270 degrees, ffmpeg decodes it upright
+        return height, width
+    return width, height
+
+
+def _handler_type(data: bytes, mdia_start: int, mdia_end: int) -> bytes | None:
+    hdlr = _find_box(data, b"hdlr", mdia_start, mdia_end)
+    if hdlr is None or hdlr[0] + 12 > hdlr[1]:
+        return None
+    return data[hdlr[0] + 8 : hdlr[0] + 12]
+
+
+def _codec(data: bytes, mdia_start: int, mdia_end: int) -> str:
+    stsd = _find_path(data, [b"minf", b"stbl", b"stsd"], mdia_start, mdia_end)
+    if stsd is None or stsd + 16 > len(data):
+        return ""
+    # The first sample entry's type is the codec, like avc1 or hvc1
+    return data[stsd + 12 : stsd + 16].decode("latin-1")
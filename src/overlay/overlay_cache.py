@@ -0,0 +1,147 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from typing import ClassVar
+
+from PIL import Image
+
+from src.overlay.scratch_file import write_scratch_file
+
+# Decoded RGBA pixels kept per process, about eight full-screen 1080x1920 overlays
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+CacheKey = tuple[str, tuple[int, int]]
+
+
+@dataclass
+class CachedOverlay:
+    image: Image.Image
+    png_path: Path | None = None
+    png_lock: Lock = field(default_factory=Lock)
+    users: int = 0
+    evicted: bool = False
+    # The non-transparent part and where it sits, None when nothing is visible
+    visible_image: Image.Image | None = field(init=False)
+    visible_offset: tuple[int, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Captions usually cover a thin band, only that band needs blending
+        visible_box = self.image.getchannel("A").getbbox()
+        self.visible_image = None
+        self.visible_offset = (0, 0)
+        if visible_box is not None:
+            self.visible_image = self.image.crop(visible_box)
+            self.visible_offset = visible_box[:2]
+
+    @property
+    def size_bytes(self) -> int:
+        width, height = self.image.size
+        return width * height * 4
+
+
+class OverlayCache:
+    # Recurring stickers and captions are the same PNG, so each overlay is
+    # decoded, converted and resized once per target size
+    _entries: ClassVar[OrderedDict[CacheKey, CachedOverlay]] = OrderedDict()
+    _cached_bytes = 0
+    _lock = Lock()
+
+    @classmethod
+    def image(
+        cls, overlay_bytes: bytes, size: tuple[int, int]
+    ) -> tuple[Image.Image, bool]:
+        # The prepared RGBA overlay and whether it came from the cache
+        entry, cache_hit = cls._entry(overlay_bytes, size)
+        return entry.image, cache_hit
+
+    @classmethod
+    def visible_region(
+        cls, overlay_bytes: bytes, size: tuple[int, int]
+    ) -> tuple[Image.Image | None, tuple[int, int], bool]:
+        # The overlay cropped to its non-transparent box, with the box's offset
+        entry, cache_hit = cls._entry(overlay_bytes, size)
+        return entry.visible_image, entry.visible_offset, cache_hit
+
+    @classmethod
+    @contextmanager
+    def png(
+        cls, overlay_bytes: bytes, size: tuple[int, int]
+    ) -> Iterator[tuple[Path, bool]]:
+        # The prepared overlay as a PNG file, kept until evicted and unused
+        entry, cache_hit = cls._entry(overlay_bytes, size)
+        with cls._lock:
+            entry.users += 1
+        try:
+            with entry.png_lock:
+                if entry.png_path is None:
+                    png_buffer = BytesIO()
+                    entry.image.save(png_buffer, format="PNG")
+                    png_buffer.seek(0)
+                    entry.png_path = write_scratch_file(".png", png_buffer)
+            yield entry.png_path, cache_hit
+        finally:
+            with cls._lock:
+                entry.users -= 1
+                if entry.evicted:
+                    cls._discard(entry)
+
+    @classmethod
+    def close(cls) -> None:
+        with cls._lock:
+            for entry in cls._entries.values():
+                entry.evicted = True
+                cls._discard(entry)
+            cls._entries.clear()
+            cls._cached_bytes = 0
+
+    @classmethod
+    def _entry(
+        cls, overlay_bytes: bytes, size: tuple[int, int]
+    ) -> tuple[CachedOverlay, bool]:
+        key = (hashlib.sha256(overlay_bytes).hexdigest(), size)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None:
+                cls._entries.move_to_end(key)
+                return entry, True
+
+        # Decoded outside the lock, other overlays aren't held up meanwhile
+        prepared = CachedOverlay(cls._prepare(overlay_bytes, size))
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                entry = prepared
+                cls._entries[key] = entry
+                cls._cached_bytes += entry.size_bytes
+                cls._evict()
+            return entry, False
+
+    @classmethod
+    def _evict(cls) -> None:
+        # The newest entry is last, so it stays even when larger than the budget
+        while cls._cached_bytes > MAX_CACHE_BYTES and len(cls._entries) > 1:
+            _, entry = cls._entries.popitem(last=False)
+            cls._cached_bytes -= entry.size_bytes
+            entry.evicted = True
+            cls._discard(entry)
+
+    @staticmethod
+    def _discard(entry: CachedOverlay) -> None:
+        # A PNG still passed to ffmpeg is removed by its last user
+        if entry.users == 0 and entry.png_path is not None:
+            entry.png_path.unlink(missing_ok=True)
+            entry.png_path = None
+
+    @staticmethod
+    def _prepare(overlay_bytes: bytes, size: tuple[int, int]) -> Image.Image:
+        with Image.open(BytesIO(overlay_bytes)) as decoded_image:
+            overlay_image = decoded_image.convert("RGBA")
+        # In some cases the overlay image is mismatched by 1 pixel
+        if overlay_image.size != size:
+            overlay_image = overlay_image.resize(size, Image.Resampling.LANCZOS)
+        return overlay_image
@@ -0,0 +1,20 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+from src.config import Config
+
+
+def write_scratch_file(suffix: str, content: BinaryIO) -> Path:
+    # Short-lived files for ffmpeg go to --scratch-dir, a tmpfs keeps them off disk
+    scratch_dir = Config.cli_options["scratch_dir"]
+    if scratch_dir is not None:
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        delete=False,
+        suffix=suffix,
+        dir=scratch_dir,
+    ) as scratch_file:
+        shutil.copyfileobj(content, scratch_file)
+        return Path(scratch_file.name)
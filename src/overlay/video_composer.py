@@ -1,52 +1,64 @@
 import subprocess
-import tempfile
-from io import BytesIO
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO
 
-from imageio_ffmpeg import get_ffmpeg_exe
-from PIL import Image
-
-from src.config import Config
+from src.logger import log
+from src.overlay.mp4_header import probe_video, read_faststart_header, read_moov
+from src.overlay.overlay_cache import OverlayCache
+from src.overlay.scratch_file import write_scratch_file
 
 
 class VideoComposer:
-    def __init__(
-        self, video_bytes: bytes, overlay_bytes: bytes, output_path: Path
-    ) -> None:
-        self.video_bytes = video_bytes
+    def __init__(self, media: BinaryIO, overlay_bytes: bytes) -> None:
+        # media is the video member of the archive, opened for reading
+        self.media = media
         self.overlay_bytes = overlay_bytes
-        self.output_path = output_path
-
-    def apply_overlay(self) -> None:
-        # FFMPEG can't read from memory, so we need to write to temp files
-        video_temporary_file_path = self._write_video_to_temp_file(".mp4")
-        video_width, video_height = self._get_video_dimensions(
-            video_temporary_file_path,
-        )
+        self.cache_hit = False
 
-        overlay_image = Image.open(BytesIO(self.overlay_bytes))
-        # In some cases the overlay image is mismatched by 1 pixel
-        overlay_image = self._resize_to_match(
-            overlay_image,
-            (video_width, video_height),
-        )
-        overlay_temporary_file_path = self._write_overlay_to_temp_file(overlay_image)
+    @contextmanager
+    def prepare(self) -> Iterator[tuple[Path | BinaryIO, Path]]:
+        # Yields the video input for ffmpeg and the overlay sized to it. The
+        # overlay is drawn by the same ffmpeg pass that encodes the video
+        scratch_path = None
+        try:
+            header = read_faststart_header(self.media)
+            self.media.seek(0)
+            if header is not None:
+                # The index comes first, so ffmpeg can read the video from a pipe
+                video_source = self.media
+                video_size = self._video_size("pipe:0", header)
+            else:
+                video_source = scratch_path = write_scratch_file(".mp4", self.media)
+                with Path.open(scratch_path, "rb") as video:
+                    moov = read_moov(video)
+                video_size = self._video_size(str(scratch_path), moov)
 
-        ffmpeg_command = self._build_ffmpeg_overlay_command(
-            video_temporary_file_path,
-            overlay_temporary_file_path,
-        )
-        ffmpeg_timeout = Config.cli_options["ffmpeg_timeout"]
-        self._run_ffmpeg_command(ffmpeg_command, ffmpeg_timeout)
-        self._cleanup_temp_files(video_temporary_file_path, overlay_temporary_file_path)
+            overlay = OverlayCache.png(self.overlay_bytes, video_size)
+            with overlay as (overlay_path, cache_hit):
+                self.cache_hit = cache_hit
+                yield video_source, overlay_path
+        finally:
+            if scratch_path is not None:
+                scratch_path.unlink(missing_ok=True)
 
-    def _write_video_to_temp_file(self, suffix: str) -> str:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file.write(self.video_bytes)
-            return temp_file.name
+    @staticmethod
+    def _video_size(video_input: str, header: bytes | None) -> tuple[int, int]:
+        # The moov box already holds the size, ffprobe is only a fallback for
+        # files the parser doesn't understand
+        video_info = probe_video(header) if header is not None else None
+        if video_info is not None:
+            return video_info.width, video_info.height
+        log(f"Probing {video_input} with ffprobe", "debug")
+        piped_header = header if video_input == "pipe:0" else None
+        return VideoComposer._get_video_dimensions(video_input, piped_header)
 
     @staticmethod
-    def _get_video_dimensions(video_path: str) -> tuple[int, int]:
+    def _get_video_dimensions(
+        video_input: str, header: bytes | None = None
+    ) -> tuple[int, int]:
+        # With a header, ffprobe reads it from stdin, the video stays in the archive
         ffprobe_response = subprocess.check_output(
             [
                 "ffprobe",
@@ -58,67 +70,15 @@ class VideoComposer:
                 "stream=width,height",
                 "-of",
                 "csv=p=0",
-                video_path,
+                video_input,
             ],
-            text=True,
-        )
-        return tuple(map(int, ffprobe_response.strip().split(",")))
-
-    @staticmethod
-    def _resize_to_match(
-        image: Image.Image,
-        target_size: tuple[int, int],
-    ) -> Image.Image:
-        if image.size != target_size:
-            return image.resize(target_size, Image.Resampling.LANCZOS)
-        return image
-
-    @staticmethod
-    def _write_overlay_to_temp_file(overlay_image: Image.Image) -> str:
-        with tempfile.NamedTemporaryFile(
-            delete=False,
-            suffix=".png",
-        ) as overlay_temporary_file:
-            overlay_image.save(overlay_temporary_file, format="PNG")
-            return overlay_temporary_file.name
-
-    def _build_ffmpeg_overlay_command(
-        self, video_path: str, overlay_path: str
-    ) -> list[str]:
-        return [
-            get_ffmpeg_exe(),
-            "-i",
-            video_path,
-            "-i",
-            overlay_path,
-            "-filter_complex",
-            "overlay=0:0",
-            "-c",
-            "copy",
-            str(self.output_path),
-        ]
-
-    def _run_ffmpeg_command(
-        self, command: list, timeout: int
-    ) -> subprocess.CompletedProcess:
-        return subprocess.run(
-            command,
-            check=True,
-            timeout=timeout,
-            capture_output=True,
-            creationflags=self.create_creation_flags(),
+            input=header,
+            creationflags=VideoComposer.create_creation_flags(),
         )
+        return tuple(map(int, ffprobe_response.decode().strip().split(",")))
 
     @staticmethod
     def create_creation_flags() -> int:
         if hasattr(subprocess, "CREATE_NO_WINDOW"):
             return subprocess.CREATE_NO_WINDOW
         return 0
-
-    @staticmethod
-    def _cleanup_temp_files(
-        video_temporary_file_path: str,
-        overlay_temporary_file_path: str,
-    ) -> None:
-        Path(video_temporary_file_path).unlink(missing_ok=True)
-        Path(overlay_temporary_file_path).unlink(missing_ok=True)
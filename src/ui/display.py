@@ -1,6 +1,5 @@
 from time import time
 
-from src.config import Config
 from src.ui.format_time import format_time
 from src.ui.generate_progress_bar import GenerateProgressBar
 from src.ui.stats_manager import StatsManager
@@ -46,10 +45,8 @@ class Display:
         print(f"╚{'═' * display_size}╝")
 
     def _get_first_line(self) -> str:
-        attempt = str(StatsManager.current_attempt)
-        total_attempts = Config.cli_options["max_attempts"]
         left = " SNAPCHAT MEMORIES DOWNLOADER"
-        right = f"ATTEMPT {attempt} / {total_attempts} "
+        right = f"RETRIES {StatsManager.retried_count} "
         return left.ljust(display_size - len(right)) + right
 
     @staticmethod
@@ -8,6 +8,9 @@ class StatsManager:
     start_time = time()
     successful_downloads_count = 0
     failed_downloads_count = 0
+    retried_count = 0
+    overlay_cache_hits = 0
+    overlay_cache_misses = 0
     total_bytes = 0
     errors: ClassVar[list[str]] = []
     completed_indices: ClassVar[set[int]] = set()
@@ -19,6 +22,9 @@ class StatsManager:
         cls.start_time = time()
         cls.successful_downloads_count = 0
         cls.failed_downloads_count = 0
+        cls.retried_count = 0
+        cls.overlay_cache_hits = 0
+        cls.overlay_cache_misses = 0
         cls.total_bytes = 0
         cls.errors = []
         cls.completed_indices = set()
@@ -1,16 +1,45 @@
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
 from zipfile import ZipFile
 
 from src.config import Config
 
 
 class ZipProcessor:
-    def __init__(self, file_path: str) -> None:
+    # A path on disk or an archive that never left memory, ZipFile reads both
+    def __init__(self, file_path: str | Path | BinaryIO) -> None:
         self.file_path = file_path
 
     def extract_media_from_zip(self) -> tuple[bytes | None, str | None, bytes | None]:
         with ZipFile(self.file_path, "r") as zip_file:
             return self._read_files(zip_file)
 
+    def media_extension(self) -> str:
+        with ZipFile(self.file_path, "r") as zip_file:
+            return self._get_extension(self._find_file(zip_file, find_png=False))
+
+    def read_overlay(self) -> bytes | None:
+        with ZipFile(self.file_path, "r") as zip_file:
+            overlay_file_name = self._find_file(zip_file, find_png=True)
+            if overlay_file_name is None:
+                return None
+            return zip_file.read(overlay_file_name)
+
+    @contextmanager
+    def open_media(self) -> Iterator[BinaryIO]:
+        # Reads the member as a stream, so a large video is never held in memory
+        with ZipFile(self.file_path, "r") as zip_file:
+            media_file_name = self._find_file(zip_file, find_png=False)
+            with zip_file.open(media_file_name) as media:
+                yield media
+
+    def extract_media_to(self, output_path: Path) -> None:
+        with self.open_media() as media, Path.open(output_path, "wb") as output:
+            shutil.copyfileobj(media, output)
+
     def _read_files(
         self, zip_file: ZipFile
     ) -> tuple[bytes | None, bytes | None, str | None]:
@@ -22,6 +22,9 @@ def create_test_cli_options(apply_overlay: bool) -> dict:
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
 
 
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncIterator
+from hashlib import sha256
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from src.config import Config
+from src.downloader.async_download_service import AsyncDownloadService
+from src.downloader.async_downloader import AsyncMemoryDownloader
+from src.downloader.download_task import DownloadTask
+from src.downloader.downloader import MemoryDownloader
+from src.downloader.part_file import PartFile
+from src.downloader.setup_downloader import SetupDownloader
+from src.memories import Memory
+
+BODY = b"0123456789" * 100
+
+
+@pytest.fixture(autouse=True)
+def temp_config(tmp_path, monkeypatch):
+    Config.cli_options = {
+        "max_concurrent_downloads": 4,
+        "download_engine": "async",
+        "strict_location": False,
+        "log_level": logging.CRITICAL,
+        "min_concurrent_downloads": None,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+        "jxl_workers": 1,
+        "scratch_dir": None,
+        "request_timeout": 30,
+        "stream_chunk_size": 64,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
+    }
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+
+
+def make_memory(url: str, second: int = 0) -> Memory:
+    return Memory.model_validate(
+        {
+            "Date": f"2023-12-05 12:34:{second:02d} UTC",
+            "Media Download Url": url,
+            "Media Type": "Video",
+            "Location": None,
+        },
+    )
+
+
+async def serve_and_download(paths: list[str], status: int = 200) -> list:
+    async def handler(_request: web.Request) -> web.Response:
+        return web.Response(body=BODY, status=status, content_type="video/mp4")
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    memories = [
+        make_memory(f"http://127.0.0.1:{port}/{path}", second)
+        for second, path in enumerate(paths)
+    ]
+    try:
+        async with AsyncMemoryDownloader.open_http_session() as http_session:
+            return await asyncio.gather(
+                *(DownloadTask(memory).run_async(http_session) for memory in memories)
+            )
+    finally:
+        await runner.cleanup()
+
+
+def test_async_engine_downloads_files() -> None:
+    results = asyncio.run(serve_and_download([str(i) for i in range(5)]))
+
+    for file_path, download_succeeded in results:
+        assert download_succeeded
+        assert file_path.read_bytes() == BODY
+
+
+def test_async_engine_reports_http_errors() -> None:
+    results = asyncio.run(serve_and_download(["missing"], status=404))
+
+    assert results == [(None, False)]
+
+
+@pytest.mark.parametrize(
+    "engine, expected", [("async", AsyncMemoryDownloader), ("thread", MemoryDownloader)]
+)
+def test_engine_option_selects_downloader(engine: str, expected: type) -> None:
+    Config.cli_options["download_engine"] = engine
+    assert type(SetupDownloader._create_downloader()) is expected
+
+
+def test_resumed_part_is_hashed_off_the_event_loop(monkeypatch) -> None:
+    memory = make_memory("http://example.com/file.mp4")
+    part_file = PartFile(memory)
+    part_file.path.write_bytes(BODY[:600])
+    part_file._save_validators({"Content-Length": str(len(BODY))})
+    hashing_threads = []
+    start_digest = PartFile.start_digest
+
+    def recording_start_digest(self: PartFile, status_code: int) -> object:
+        hashing_threads.append(threading.current_thread())
+        return start_digest(self, status_code)
+
+    monkeypatch.setattr(PartFile, "start_digest", recording_start_digest)
+
+    async def iter_chunked(_chunk_size: int) -> AsyncIterator[bytes]:
+        yield BODY[600:]
+
+    response = SimpleNamespace(
+        status=206,
+        headers={"Content-Range": f"bytes 600-{len(BODY) - 1}/{len(BODY)}"},
+        content=SimpleNamespace(iter_chunked=iter_chunked),
+    )
+
+    async def resume() -> tuple[Path | None, threading.Thread]:
+        service = AsyncDownloadService(memory, http_session=None)
+        file_path = await service._store_streamed_memory(response, part_file)
+        return file_path, threading.current_thread()
+
+    file_path, loop_thread = asyncio.run(resume())
+
+    assert file_path.read_bytes() == BODY
+    assert memory.content_digest == sha256(BODY).hexdigest()
+    assert hashing_threads
+    assert loop_thread not in hashing_threads
+
+
+def test_async_engine_requests_media_without_compression() -> None:
+    encodings = []
+
+    async def download() -> None:
+        async def handler(request: web.Request) -> web.Response:
+            encodings.append(request.headers.get("Accept-Encoding"))
+            return web.Response(body=BODY, content_type="video/mp4")
+
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        port = runner.addresses[0][1]
+        try:
+            async with AsyncMemoryDownloader.open_http_session() as http_session:
+                memory = make_memory(f"http://127.0.0.1:{port}/file")
+                await DownloadTask(memory).run_async(http_session)
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(download())
+
+    assert encodings == ["identity"]
@@ -0,0 +1,103 @@
+import logging
+from threading import Lock
+from unittest.mock import patch
+
+import pytest
+
+from src.config import Config
+from src.downloader import downloader
+from src.downloader.async_downloader import AsyncMemoryDownloader
+from src.downloader.download_task import DownloadTask
+from src.downloader.downloader import MemoryDownloader
+from src.memories import Memory
+
+TOTAL_MEMORIES = 60
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "max_concurrent_downloads": 2,
+            "processing_workers": 1,
+            "cpu_workers": 0,
+            "state_db": None,
+            "max_attempts": 1,
+            "log_level": logging.CRITICAL,
+            "min_concurrent_downloads": None,
+            "rate_limit": None,
+            "bandwidth_limit": None,
+            "output_layout": "flat",
+            "jxl_workers": 1,
+            "scratch_dir": None,
+            "request_timeout": 30,
+        },
+    )
+    monkeypatch.setattr(downloader, "SUBMIT_WINDOW_PER_WORKER", 3)
+
+
+def make_memories(produced: list[int]):
+    for index in range(TOTAL_MEMORIES):
+        produced.append(index)
+        yield Memory.model_validate(
+            {
+                "Date": "2023-12-05 12:34:56 UTC",
+                "Media Download Url": f"http://example.com/{index}",
+                "Media Type": "Image",
+                "Location": None,
+            },
+        )
+
+
+class WindowProbe:
+    def __init__(self, memory_downloader: MemoryDownloader) -> None:
+        self.memory_downloader = memory_downloader
+        self.peak_in_flight = 0
+        self._lock = Lock()
+
+    def record(self) -> None:
+        with self._lock:
+            in_flight = (
+                self.memory_downloader._submitted_count
+                - self.memory_downloader._collected_count
+            )
+            self.peak_in_flight = max(self.peak_in_flight, in_flight)
+
+
+def run_with_probe(memory_downloader: MemoryDownloader) -> tuple[WindowProbe, list]:
+    produced = []
+    probe = WindowProbe(memory_downloader)
+    memory_downloader._gather_download_tasks = lambda: make_memories(produced)
+    memory_downloader._check_for_success = lambda *_args: probe.record()
+
+    def fake_download(_task: DownloadTask) -> tuple[None, bool]:
+        probe.record()
+        return None, False
+
+    async def fake_download_async(
+        task: DownloadTask, _http_session: object
+    ) -> tuple[None, bool]:
+        return fake_download(task)
+
+    with (
+        patch("src.downloader.download_task.DownloadTask.run", fake_download),
+        patch(
+            "src.downloader.download_task.DownloadTask.run_async",
+            fake_download_async,
+        ),
+    ):
+        memory_downloader.run()
+    return probe, produced
+
+
+@pytest.mark.parametrize("engine", [MemoryDownloader, AsyncMemoryDownloader])
+def test_in_flight_memories_stay_within_window(engine: type) -> None:
+    memory_downloader = engine()
+
+    probe, produced = run_with_probe(memory_downloader)
+
+    assert len(produced) == TOTAL_MEMORIES
+    assert memory_downloader._collected_count == TOTAL_MEMORIES
+    assert probe.peak_in_flight <= 2 * 3
@@ -0,0 +1,95 @@
+import logging
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from src import FileNameResolver
+from src.config import Config
+from src.converters import CjxlPool, JXLConverter
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {"jxl_workers": 2, "cjxl_timeout": 120, "log_level": logging.CRITICAL},
+    )
+    yield
+    CjxlPool.close()
+    FileNameResolver.reset()
+
+
+def test_running_cjxl_processes_are_capped() -> None:
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def cjxl(command: list[str], **_kwargs: object) -> subprocess.CompletedProcess:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return subprocess.CompletedProcess(command, 0)
+
+    with (
+        patch("src.converters.cjxl_pool.subprocess.run", side_effect=cjxl),
+        ThreadPoolExecutor(max_workers=6) as processing_threads,
+    ):
+        results = list(
+            processing_threads.map(lambda _: CjxlPool.run(["cjxl"], 120), range(6))
+        )
+
+    assert peak == 2
+    assert all(result.returncode == 0 for result in results)
+
+
+@pytest.mark.parametrize(
+    ("cpu_count", "jxl_workers", "expected"),
+    [(8, 2, 4), (8, 3, 2), (2, 4, 1), (None, 1, 1)],
+)
+def test_threads_split_the_cores(cpu_count, jxl_workers, expected) -> None:
+    Config.cli_options["jxl_workers"] = jxl_workers
+
+    with patch("src.converters.cjxl_pool.os.cpu_count", return_value=cpu_count):
+        assert CjxlPool.threads_per_process() == expected
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="nice is POSIX only")
+def test_cjxl_runs_with_lower_priority(tmp_path) -> None:
+    with (
+        patch.object(JXLConverter, "_get_cjxl_path", return_value="cjxl"),
+        patch("src.converters.cjxl_pool.subprocess.run") as mock_run,
+        patch("src.converters.cjxl_pool.os.cpu_count", return_value=8),
+    ):
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        JXLConverter(tmp_path / "file.jpg").run_from_bytes(b"jpeg")
+
+    command = mock_run.call_args.args[0]
+    assert command[1:3] == ["-n", "10"]
+    assert command[3] == "cjxl"
+    assert "--num_threads=4" in command
+    assert mock_run.call_args.kwargs["input"] == b"jpeg"
+
+
+def test_jxl_output_name_is_reserved(tmp_path) -> None:
+    # Another memory's conversion already holds file.jxl
+    FileNameResolver(tmp_path / "file.jxl").run()
+
+    with (
+        patch.object(JXLConverter, "_get_cjxl_path", return_value="cjxl"),
+        patch("src.converters.cjxl_pool.subprocess.run") as mock_run,
+    ):
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        output_path = JXLConverter(tmp_path / "file.jpg").run_from_bytes(b"jpeg")
+
+    assert output_path == tmp_path / "file_1.jxl"
+    assert mock_run.call_args.args[0][-1] == str(output_path)
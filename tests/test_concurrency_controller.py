@@ -0,0 +1,101 @@
+from threading import Thread
+from time import perf_counter
+
+from src.config import Config
+from src.downloader.concurrency_controller import ConcurrencyController
+from src.memories import Memory
+
+
+def make_memory(error_code: str | None = None, response_seconds: float = 0.1):
+    memory = Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/media",
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+    memory.error_code = error_code
+    memory.response_seconds = response_seconds
+    return memory
+
+
+def complete_epoch(
+    controller: ConcurrencyController, response_seconds: float = 0.1
+) -> None:
+    for _ in range(controller.limit):
+        memory = make_memory(None, response_seconds)
+        memory.download_bytes = 1024
+        controller.record(memory, perf_counter())
+
+
+def test_limit_grows_by_one_per_clean_epoch() -> None:
+    controller = ConcurrencyController(2, 10)
+    complete_epoch(controller)
+    assert controller.limit == 3
+    complete_epoch(controller)
+    assert controller.limit == 4
+
+
+def test_limit_halves_on_rate_limiting_and_stays_in_range() -> None:
+    controller = ConcurrencyController(2, 10)
+    controller.limit = 8
+    controller.record(make_memory("429"), perf_counter())
+    assert controller.limit == 4
+    controller.record(make_memory("503"), perf_counter())
+    controller.record(make_memory("NET"), perf_counter())
+    assert controller.limit == 2
+
+
+def test_downloads_started_before_a_decrease_are_ignored() -> None:
+    controller = ConcurrencyController(1, 10)
+    controller.limit = 8
+    started_at = perf_counter()
+    controller.record(make_memory("429"), started_at)
+    controller.record(make_memory("429"), started_at)
+    assert controller.limit == 4
+
+
+def test_latency_spike_narrows_the_limit() -> None:
+    controller = ConcurrencyController(2, 10)
+    complete_epoch(controller, response_seconds=0.1)
+    assert controller.limit == 3
+    complete_epoch(controller, response_seconds=0.5)
+    assert controller.limit == 2
+
+
+def test_permanent_errors_do_not_change_the_limit() -> None:
+    controller = ConcurrencyController(4, 10)
+    controller.record(make_memory("403"), perf_counter())
+    assert controller.limit == 4
+
+
+def test_limit_is_fixed_without_min_concurrent(monkeypatch) -> None:
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {"max_concurrent_downloads": 5, "min_concurrent_downloads": None},
+    )
+    controller = ConcurrencyController.from_config()
+    complete_epoch(controller)
+    controller.record(make_memory("429"), perf_counter())
+    assert controller.limit == 5
+
+
+def test_slots_block_beyond_the_limit() -> None:
+    controller = ConcurrencyController(1, 1)
+    order = []
+
+    def worker(name: str) -> None:
+        with controller.slot():
+            order.append(f"{name} start")
+            order.append(f"{name} end")
+
+    with controller.slot():
+        waiting = Thread(target=worker, args=("second",))
+        waiting.start()
+        waiting.join(0.05)
+        assert order == []
+        assert not controller.try_acquire()
+    waiting.join()
+    assert order == ["second start", "second end"]
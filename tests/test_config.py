@@ -15,8 +15,32 @@ from src.config.main import Config
         (["-f", "180"], {"ffmpeg_timeout": 180}),
         (["--request-timeout", "99"], {"request_timeout": 99}),
         (["-t", "77"], {"request_timeout": 77}),
+        (["--stream-chunk-size", "4096"], {"stream_chunk_size": 4096}),
+        (["-cs", "65536"], {"stream_chunk_size": 65536}),
+        (["--zip-memory-limit", "0"], {"zip_memory_limit": 0}),
+        (["-zm", "1048576"], {"zip_memory_limit": 1048576}),
+        (["--scratch-dir", "/dev/shm"], {"scratch_dir": Path("/dev/shm")}),
+        (["-sd", "scratch"], {"scratch_dir": Path("scratch")}),
         (["--concurrent", "9"], {"max_concurrent_downloads": 9}),
         (["-c", "2"], {"max_concurrent_downloads": 2}),
+        (["--min-concurrent", "2"], {"min_concurrent_downloads": 2}),
+        (["-mc", "1"], {"min_concurrent_downloads": 1}),
+        (["--rate-limit", "2.5"], {"rate_limit": 2.5}),
+        (["-rl", "10"], {"rate_limit": 10.0}),
+        (["--bandwidth-limit", "1000000"], {"bandwidth_limit": 1000000}),
+        (["-bw", "65536"], {"bandwidth_limit": 65536}),
+        (["--processing-workers", "3"], {"processing_workers": 3}),
+        (["-pw", "6"], {"processing_workers": 6}),
+        (["--cpu-workers", "0"], {"cpu_workers": 0}),
+        (["-cw", "4"], {"cpu_workers": 4}),
+        (["--jxl-workers", "2"], {"jxl_workers": 2}),
+        (["-jw", "1"], {"jxl_workers": 1}),
+        (["--engine", "async"], {"download_engine": "async"}),
+        (["-e", "thread"], {"download_engine": "thread"}),
+        (["--state-db", "state.db"], {"state_db": Path("state.db")}),
+        (["-db", "other.db"], {"state_db": Path("other.db")}),
+        (["--layout", "month"], {"output_layout": "month"}),
+        (["-L", "year"], {"output_layout": "year"}),
         (["--no-overlay"], {"apply_overlay": False}),
         (["-O"], {"apply_overlay": False}),
         (["--no-metadata"], {"write_metadata": False}),
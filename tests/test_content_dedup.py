@@ -0,0 +1,167 @@
+import logging
+from pathlib import Path
+from threading import Thread
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src import FileNameResolver
+from src.config import Config
+from src.downloader.content_index import ContentIndex
+from src.downloader.processing_stage import ProcessingStage
+from src.media_dispatcher import link_duplicate
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "processing_workers": 2,
+            "cpu_workers": 0,
+            "write_metadata": True,
+            "jpeg_quality": 95,
+            "log_level": logging.CRITICAL,
+            "output_layout": "flat",
+        },
+    )
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    FileNameResolver.reset()
+    yield
+    FileNameResolver.reset()
+
+
+def make_memory(date: str = "2023-12-05 12:34:56 UTC", location=None) -> Memory:
+    memory = Memory.model_validate(
+        {
+            "Date": date,
+            "Media Download Url": f"http://example.com/{date}",
+            "Media Type": "Image",
+            "Location": location,
+        },
+    )
+    memory.content_digest = "abc"
+    return memory
+
+
+def write_jpeg(path: Path) -> Path:
+    Image.new("RGB", (8, 8), "red").save(path)
+    return path
+
+
+def test_second_claim_waits_for_the_owner(tmp_path) -> None:
+    index = ContentIndex()
+    original = make_memory()
+    output_path = write_jpeg(tmp_path / "original.jpg")
+    claims = []
+
+    assert index.claim("abc") is None
+    waiter = Thread(target=lambda: claims.append(index.claim("abc")))
+    waiter.start()
+    waiter.join(0.05)
+    assert claims == []
+
+    index.publish("abc", original, output_path)
+    waiter.join()
+    assert claims == [(original, output_path)]
+
+
+def test_failed_owner_hands_the_digest_over() -> None:
+    index = ContentIndex()
+    assert index.claim("abc") is None
+    index.publish("abc", make_memory(), None)
+    assert index.claim("abc") is None
+
+
+def test_missing_output_hands_the_digest_over(tmp_path) -> None:
+    index = ContentIndex()
+    output_path = write_jpeg(tmp_path / "original.jpg")
+    assert index.claim("abc") is None
+    index.publish("abc", make_memory(), output_path)
+    output_path.unlink()
+
+    assert index.claim("abc") is None
+    replacement = write_jpeg(tmp_path / "replacement.jpg")
+    memory = make_memory()
+    index.publish("abc", memory, replacement)
+    assert index.claim("abc") == (memory, replacement)
+
+
+def test_identical_copy_is_hardlinked(tmp_path) -> None:
+    original = make_memory()
+    original_path = write_jpeg(tmp_path / "original.jpg")
+    duplicate = make_memory()
+    download = write_jpeg(tmp_path / "download.jpg")
+
+    linked_path = link_duplicate(duplicate, download, original, original_path)
+
+    # The copy keeps its own download name, no _N suffix is added
+    assert linked_path == download
+    assert linked_path.samefile(original_path)
+
+
+def test_copy_of_converted_original_is_linked_beside_it(tmp_path) -> None:
+    # The original was downloaded as x.jpg and converted to x.jxl
+    name = tmp_path / "2023-12-05_12-34-56.jpg"
+    FileNameResolver(name).run()
+    original_path = FileNameResolver(name.with_suffix(".jxl")).run()
+    original_path.write_bytes(b"jxl")
+    download = write_jpeg(FileNameResolver(name).run())
+
+    linked_path = link_duplicate(make_memory(), download, make_memory(), original_path)
+
+    assert linked_path == tmp_path / "2023-12-05_12-34-56_1.jxl"
+    assert linked_path.samefile(original_path)
+    assert original_path.read_bytes() == b"jxl"
+
+
+def test_copy_with_other_date_gets_its_own_metadata(tmp_path) -> None:
+    original = make_memory()
+    original_path = write_jpeg(tmp_path / "original.jpg")
+    duplicate = make_memory("2024-01-01 08:00:00 UTC")
+    download = write_jpeg(tmp_path / "download.jpg")
+
+    linked_path = link_duplicate(duplicate, download, original, original_path)
+
+    assert not linked_path.samefile(original_path)
+    with Image.open(linked_path) as image:
+        assert b"2024:01:01 08:00:00" in image.info["exif"]
+
+
+def test_converted_copy_with_other_metadata_is_processed(tmp_path) -> None:
+    original = make_memory()
+    original_path = tmp_path / "original.jxl"
+    original_path.write_bytes(b"jxl")
+    download = write_jpeg(tmp_path / "download.jpg")
+
+    assert (
+        link_duplicate(
+            make_memory("2024-01-01 08:00:00 UTC"), download, original, original_path
+        )
+        is None
+    )
+    assert download.exists()
+
+
+def test_stage_processes_identical_downloads_once(tmp_path) -> None:
+    def fake_process(_memory: Memory, file_path: Path) -> Path:
+        output_path = file_path.with_suffix(".out.jpg")
+        file_path.replace(output_path)
+        return output_path
+
+    with patch(
+        "src.downloader.processing_stage.process_media", side_effect=fake_process
+    ) as mock_process:
+        stage = ProcessingStage()
+        for index in range(3):
+            download = write_jpeg(tmp_path / f"download_{index}.jpg")
+            stage.hand_over(make_memory(), download, download_succeeded=True)
+        results = [stage.results.get(timeout=5) for _ in range(3)]
+        stage.close()
+
+    assert mock_process.call_count == 1
+    assert all(succeeded for _, _, succeeded in results)
+    assert len({path.stat().st_ino for _, path, _ in results}) == 1
@@ -22,6 +22,9 @@ def test_convert_to_jxl_behavior(convert_to_jxl, tmp_path) -> None:
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
     memory = Memory.model_validate(
         {
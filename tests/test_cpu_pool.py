@@ -0,0 +1,113 @@
+import logging
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO
+
+import piexif
+import pytest
+from PIL import Image
+
+from src import FileNameResolver, OutputLayout
+from src.config import Config
+from src.media_dispatcher.cpu_pool import CpuPool
+from src.media_dispatcher.image_processor import write_image_metadata
+from src.media_dispatcher.zip_processor import ZipProcessor, write_composed_image
+from src.memories import Memory
+from src.overlay import OverlayCache
+
+
+@pytest.fixture(autouse=True)
+def cli_options():
+    Config.cli_options = {
+        "cpu_workers": 1,
+        "state_db": None,
+        "apply_overlay": True,
+        "write_metadata": True,
+        "convert_to_jxl": False,
+        "output_layout": "flat",
+        "scratch_dir": None,
+        "jpeg_quality": 90,
+        "log_level": logging.CRITICAL,
+    }
+    yield
+    CpuPool.close()
+    FileNameResolver.reset()
+    OutputLayout.reset()
+    OverlayCache.close()
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.jpg",
+            "Media Type": "Image",
+            "Location": "Latitude, Longitude: 40.0, -73.0",
+        },
+    )
+
+
+def encode_image(mode: str, color: tuple, image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, (8, 8), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("cpu_workers", [0, 1])
+def test_metadata_written_by_worker(memory, cpu_workers: int, tmp_path: Path) -> None:
+    Config.cli_options["cpu_workers"] = cpu_workers
+    file_path = tmp_path / "file.jpg"
+    file_path.write_bytes(encode_image("RGB", (255, 0, 0), "JPEG"))
+
+    CpuPool.run(write_image_metadata, memory, file_path)
+
+    exif = piexif.load(str(file_path))
+    assert exif["Exif"][piexif.ExifIFD.DateTimeOriginal] == b"2023:12:05 12:34:56"
+    assert exif["GPS"][piexif.GPSIFD.GPSLatitudeRef] == b"N"
+
+
+def write_archive(archive: Path | BinaryIO) -> None:
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("media.jpg", encode_image("RGB", (0, 0, 255), "JPEG"))
+        zip_file.writestr("overlay.png", encode_image("RGBA", (0, 0, 0, 0), "PNG"))
+
+
+def test_zipped_image_composed_by_worker(memory, tmp_path: Path) -> None:
+    zip_path = tmp_path / "file.zip"
+    write_archive(zip_path)
+    output_path = tmp_path / "file.jpg"
+
+    cache_hit = CpuPool.run(write_composed_image, zip_path, memory, output_path)
+
+    with Image.open(output_path) as image:
+        assert image.format == "JPEG"
+        assert image.size == (8, 8)
+    assert not cache_hit
+    exif = piexif.load(str(output_path))
+    assert exif["Exif"][piexif.ExifIFD.DateTimeOriginal] == b"2023:12:05 12:34:56"
+
+
+def test_buffered_archive_is_spilled_for_the_worker(
+    memory, tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path / "downloads")
+    Config.cli_options["scratch_dir"] = tmp_path / "scratch"
+    archive = BytesIO()
+    write_archive(archive)
+
+    output_path = ZipProcessor(memory, archive).run()
+
+    assert output_path == tmp_path / "downloads" / f"{memory.filename}.jpg"
+    with Image.open(output_path) as image:
+        assert image.format == "JPEG"
+    assert not list((tmp_path / "scratch").glob("*.zip"))
+    assert archive.closed
+
+
+def test_pool_is_shared_until_closed() -> None:
+    first = CpuPool._get()
+    assert CpuPool._get() is first
+    CpuPool.close()
+    assert CpuPool._get() is not first
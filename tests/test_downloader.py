@@ -24,6 +24,9 @@ def temp_config():
             "request_timeout": 30,
             "ffmpeg_timeout": 60,
             "stream_chunk_size": 1024 * 1024,
+            "processing_workers": 2,
+            "cpu_workers": 0,
+            "state_db": None,
         }
         yield Config(
             cli_options=cli_options,
@@ -22,6 +22,9 @@ def test_ffmpeg_timeout_behavior(ffmpeg_timeout, tmp_path) -> None:
         "request_timeout": 30,
         "ffmpeg_timeout": ffmpeg_timeout,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
     memory = Memory.model_validate(
         {
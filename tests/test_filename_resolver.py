@@ -1,5 +1,8 @@
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -56,3 +59,46 @@ def test_unique_filename_second_duplicate(temp_dir, resolver) -> None:
 
     assert first_dup.name == "file_1.txt"
     assert second_dup.name == "file_2.txt"
+
+
+def test_unused_name_is_kept(temp_dir) -> None:
+    """Test that a free name is returned unchanged and then reserved"""
+    first = FileNameResolver(temp_dir / "free.txt").run()
+    second = FileNameResolver(temp_dir / "free.txt").run()
+
+    assert first.name == "free.txt"
+    assert second.name == "free_1.txt"
+
+
+def test_concurrent_workers_get_distinct_names(temp_dir) -> None:
+    """Test that threads resolving the same name never share a result"""
+    (temp_dir / "file.txt").write_text("a")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        names = list(
+            executor.map(
+                lambda _: FileNameResolver(temp_dir / "file.txt").run().name,
+                range(200),
+            )
+        )
+
+    assert len(set(names)) == 200
+
+
+def test_directory_is_scanned_once(temp_dir) -> None:
+    """Test that collisions are resolved from the index, not from disk"""
+    (temp_dir / "file.txt").write_text("a")
+
+    with patch("src.filename_resolver.os.scandir", wraps=os.scandir) as scandir:
+        for _ in range(5):
+            FileNameResolver(temp_dir / "file.txt").run()
+
+    assert scandir.call_count == 1
+
+
+def test_reset_rescans_the_directory(temp_dir) -> None:
+    """Test that a reset forgets reservations that never reached disk"""
+    FileNameResolver(temp_dir / "file.txt").run()
+    FileNameResolver.reset()
+
+    assert FileNameResolver(temp_dir / "file.txt").run().name == "file.txt"
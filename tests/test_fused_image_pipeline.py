@@ -0,0 +1,129 @@
+import logging
+import subprocess
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import piexif
+import pytest
+from PIL import Image
+
+from src import FileNameResolver
+from src.config import Config
+from src.converters import JXLConverter
+from src.media_dispatcher.zip_processor import ZipProcessor
+from src.memories import Memory
+from src.overlay import OverlayCache
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "apply_overlay": True,
+            "write_metadata": True,
+            "convert_to_jxl": False,
+            "jpeg_quality": 95,
+            "cpu_workers": 0,
+            "cjxl_timeout": 120,
+            "log_level": logging.CRITICAL,
+            "output_layout": "flat",
+            "jxl_workers": 1,
+            "scratch_dir": None,
+        },
+    )
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    FileNameResolver.reset()
+    yield
+    FileNameResolver.reset()
+    OverlayCache.close()
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.zip",
+            "Media Type": "Image",
+            "Location": "Latitude, Longitude: 40.0, -73.0",
+        },
+    )
+
+
+def image_bytes(mode: str, color: str | tuple, image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, (8, 8), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_archive(path: Path) -> Path:
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.writestr("media.jpg", image_bytes("RGB", "red", "JPEG"))
+        zip_file.writestr("overlay.png", image_bytes("RGBA", (0, 0, 0, 0), "PNG"))
+    return path
+
+
+def test_composed_image_is_tagged_without_second_encode(memory, tmp_path) -> None:
+    archive = make_archive(tmp_path / "file.jpg")
+
+    with patch("src.metadata.image_metadata_writer.piexif.insert") as mock_insert:
+        output_path = ZipProcessor(memory, archive).run()
+
+    mock_insert.assert_not_called()
+    assert output_path == tmp_path / "file.jpg"
+    exif = piexif.load(str(output_path))
+    assert exif["Exif"][piexif.ExifIFD.DateTimeOriginal] == b"2023:12:05 12:34:56"
+    assert exif["GPS"][piexif.GPSIFD.GPSLongitudeRef] == b"W"
+
+
+def test_composed_image_skips_exif_when_metadata_disabled(memory, tmp_path) -> None:
+    Config.cli_options["write_metadata"] = False
+    archive = make_archive(tmp_path / "file.jpg")
+
+    output_path = ZipProcessor(memory, archive).run()
+
+    with Image.open(output_path) as image:
+        assert not image.getexif()
+
+
+def test_composed_image_is_piped_to_cjxl(memory, tmp_path) -> None:
+    Config.cli_options["convert_to_jxl"] = True
+    archive = make_archive(tmp_path / "file.jpg")
+
+    with (
+        patch.object(JXLConverter, "_get_cjxl_path", return_value="cjxl"),
+        patch("src.converters.cjxl_pool.subprocess.run") as mock_run,
+    ):
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        output_path = ZipProcessor(memory, archive).run()
+
+    assert output_path == tmp_path / "file.jxl"
+    command = mock_run.call_args.args[0]
+    assert command[-2:] == ["-", str(output_path)]
+    assert piexif.load(mock_run.call_args.kwargs["input"])["Exif"]
+    assert not (tmp_path / "file.jpg").exists()
+
+
+def test_cjxl_without_stdin_converts_the_written_jpeg(tmp_path) -> None:
+    jpeg_path = tmp_path / "file.jpg"
+    jpeg_bytes = image_bytes("RGB", "blue", "JPEG")
+
+    def cjxl(command: list[str], **_kwargs: object) -> subprocess.CompletedProcess:
+        if command[-2] == "-":
+            return subprocess.CompletedProcess(command, 1, stderr=b"no stdin")
+        assert Path(command[-2]).read_bytes() == jpeg_bytes
+        Path(command[-1]).write_bytes(b"jxl")
+        return subprocess.CompletedProcess(command, 0)
+
+    with (
+        patch.object(JXLConverter, "_get_cjxl_path", return_value="cjxl"),
+        patch("src.converters.cjxl_pool.subprocess.run", side_effect=cjxl),
+    ):
+        output_path = JXLConverter(jpeg_path).run_from_bytes(jpeg_bytes)
+
+    assert output_path == tmp_path / "file.jxl"
+    assert not jpeg_path.exists()
@@ -0,0 +1,38 @@
+import logging
+
+import pytest
+
+from src.config import Config
+from src.downloader.http_session import HttpSession
+
+
+@pytest.fixture(autouse=True)
+def cli_options():
+    Config.cli_options = {
+        "max_concurrent_downloads": 4,
+        "log_level": logging.CRITICAL,
+        "request_timeout": 30,
+    }
+    yield
+    HttpSession.close()
+
+
+def test_session_is_shared_between_calls() -> None:
+    assert HttpSession.get() is HttpSession.get()
+
+
+def test_adapter_pool_sized_from_concurrency() -> None:
+    adapter = HttpSession.get().get_adapter("https://")
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 8
+
+
+def test_close_releases_session() -> None:
+    first = HttpSession.get()
+    HttpSession.close()
+    assert HttpSession.get() is not first
+
+
+def test_pool_counters_start_empty() -> None:
+    session = HttpSession.get()
+    assert HttpSession._collect_pool_counters(session) == (0, 0)
@@ -0,0 +1,86 @@
+import logging
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from src.config import Config
+from src.overlay import ImageComposer, OverlayCache
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {"jpeg_quality": 100, "log_level": logging.CRITICAL},
+    )
+    OverlayCache.close()
+    yield
+    OverlayCache.close()
+
+
+def encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_photo() -> Image.Image:
+    photo = Image.linear_gradient("L").resize((120, 160)).convert("RGB")
+    return Image.merge("RGB", (*photo.split()[:2], photo.split()[2].rotate(90)))
+
+
+def make_caption() -> Image.Image:
+    # Transparent except for a half-opaque band and a solid sticker
+    caption = Image.new("RGBA", (120, 160), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(caption)
+    draw.rectangle((0, 100, 119, 119), fill=(0, 0, 0, 128))
+    draw.ellipse((20, 30, 40, 50), fill=(255, 200, 0, 255))
+    return caption
+
+
+def decode(jpeg_bytes: bytes) -> Image.Image:
+    return Image.open(BytesIO(jpeg_bytes)).convert("RGB")
+
+
+def largest_difference(composed: bytes, expected: Image.Image) -> int:
+    # Both sides go through the same JPEG encode, only the blending may differ
+    reencoded = decode(encode_jpeg(expected))
+    difference = ImageChops.difference(decode(composed), reencoded)
+    return max(high for _, high in difference.getextrema())
+
+
+def encode_jpeg(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=100)
+    return buffer.getvalue()
+
+
+def test_region_blend_matches_full_alpha_composite() -> None:
+    photo_bytes = encode(make_photo(), "JPEG")
+    caption = make_caption()
+    photo = Image.open(BytesIO(photo_bytes)).convert("RGBA")
+    expected = Image.alpha_composite(photo, caption).convert("RGB")
+
+    composed = ImageComposer(photo_bytes, encode(caption, "PNG")).apply_overlay()
+
+    assert largest_difference(composed, expected) <= 2
+
+
+def test_transparent_overlay_keeps_the_photo() -> None:
+    photo_bytes = encode(make_photo(), "JPEG")
+    transparent = encode(Image.new("RGBA", (120, 160), (255, 0, 0, 0)), "PNG")
+
+    composed = ImageComposer(photo_bytes, transparent).apply_overlay()
+
+    assert largest_difference(composed, decode(photo_bytes)) == 0
+
+
+def test_visible_region_is_the_alpha_bounding_box() -> None:
+    region, offset, _ = OverlayCache.visible_region(
+        encode(make_caption(), "PNG"), (120, 160)
+    )
+
+    assert offset == (0, 30)
+    assert region.size == (120, 90)
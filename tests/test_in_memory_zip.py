@@ -0,0 +1,149 @@
+import logging
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from requests.structures import CaseInsensitiveDict
+
+from src.config import Config
+from src.downloader.download_service import DownloadService
+from src.downloader.part_file import PartFile
+from src.media_dispatcher.zip_processor import ZipProcessor
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "apply_overlay": False,
+            "write_metadata": False,
+            "convert_to_jxl": False,
+            "jpeg_quality": 95,
+            "cpu_workers": 0,
+            "stream_chunk_size": 16,
+            "zip_memory_limit": 1024 * 1024,
+            "log_level": logging.CRITICAL,
+            "rate_limit": None,
+            "bandwidth_limit": None,
+            "output_layout": "flat",
+            "scratch_dir": None,
+        },
+    )
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.zip",
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+
+
+def image_bytes(mode: str, color: str, image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, (8, 8), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_archive() -> bytes:
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("media.jpg", image_bytes("RGB", "red", "JPEG"))
+        zip_file.writestr("overlay.png", image_bytes("RGBA", (0, 0, 0, 0), "PNG"))
+    return buffer.getvalue()
+
+
+def zip_response(body: bytes, content_length: int | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    headers = {"Content-Type": "application/zip"}
+    if content_length is not None:
+        headers["Content-Length"] = str(content_length)
+    response.headers = CaseInsensitiveDict(headers)
+    response.iter_content.side_effect = lambda chunk_size: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    return response
+
+
+def download(memory: Memory, response: MagicMock):
+    service = DownloadService(memory)
+    service._download_memory = MagicMock(return_value=response)
+    return service.run()
+
+
+def test_small_archive_stays_in_memory(memory, tmp_path) -> None:
+    archive = make_archive()
+
+    buffer, succeeded = download(memory, zip_response(archive, len(archive)))
+
+    assert succeeded
+    assert not isinstance(buffer, Path)
+    assert buffer.read() == archive
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_buffered_archive_opens_as_zip(memory) -> None:
+    archive = make_archive()
+
+    buffer, _ = download(memory, zip_response(archive, len(archive)))
+
+    with zipfile.ZipFile(buffer) as zip_file:
+        assert sorted(zip_file.namelist()) == ["media.jpg", "overlay.png"]
+        assert zip_file.read("media.jpg") == image_bytes("RGB", "red", "JPEG")
+
+
+def test_archive_without_length_is_written_to_disk(memory) -> None:
+    archive = make_archive()
+
+    file_path, succeeded = download(memory, zip_response(archive))
+
+    assert succeeded
+    assert file_path.read_bytes() == archive
+
+
+def test_archive_above_limit_is_written_to_disk(memory) -> None:
+    archive = make_archive()
+    Config.cli_options["zip_memory_limit"] = len(archive) - 1
+
+    file_path, succeeded = download(memory, zip_response(archive, len(archive)))
+
+    assert succeeded
+    assert file_path.read_bytes() == archive
+
+
+def test_truncated_archive_fails(memory) -> None:
+    archive = make_archive()
+
+    buffer, succeeded = download(memory, zip_response(archive[:-4], len(archive)))
+
+    assert not succeeded
+    assert buffer is None
+    assert memory.error_code == "DL"
+    assert PartFile(memory).size == 0
+
+
+@pytest.mark.parametrize("apply_overlay", [True, False])
+def test_buffered_archive_is_unpacked(memory, tmp_path, apply_overlay: bool) -> None:
+    Config.cli_options["apply_overlay"] = apply_overlay
+    archive = make_archive()
+    buffer, _ = download(memory, zip_response(archive, len(archive)))
+
+    output_path = ZipProcessor(memory, buffer).run()
+
+    assert output_path == tmp_path / memory.filename_with_ext
+    assert [path.name for path in tmp_path.iterdir()] == [output_path.name]
+    with Image.open(output_path) as image:
+        assert image.size == (8, 8)
+    assert buffer.closed
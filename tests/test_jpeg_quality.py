@@ -22,6 +22,9 @@ def test_jpeg_quality_behavior(jpeg_quality, tmp_path) -> None:
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
         "cjxl_timeout": 120,
     }
     memory = Memory.model_validate(
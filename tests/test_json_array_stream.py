@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.memories import json_array_stream
+from src.memories.json_array_stream import JsonArrayStream
+
+EXPORT = {
+    "Other": [1, {"text": 'quote " and ] inside'}, 3.25, -1e-5, True, None],
+    "Saved Media": [
+        {"Date": f"2023-12-05 12:34:{i:02d} UTC", "Size": i * 1.5, "Name": "ü\\"}
+        for i in range(4)
+    ],
+    "Tail": 12345,
+}
+
+
+@pytest.fixture
+def export_path(tmp_path: Path) -> Path:
+    path = tmp_path / "memories_history.json"
+    path.write_text(json.dumps(EXPORT, indent=4), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 2, 7, 64 * 1024])
+@pytest.mark.parametrize("key", ["Saved Media", "Other"])
+def test_streams_array_across_chunk_boundaries(
+    export_path: Path, monkeypatch, chunk_chars: int, key: str
+) -> None:
+    monkeypatch.setattr(json_array_stream, "READ_CHUNK_CHARS", chunk_chars)
+    assert list(JsonArrayStream(export_path, key)) == EXPORT[key]
+
+
+def test_missing_key_yields_nothing(export_path: Path) -> None:
+    assert list(JsonArrayStream(export_path, "Missing")) == []
+
+
+def test_items_are_yielded_before_the_file_is_fully_read(
+    export_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(json_array_stream, "READ_CHUNK_CHARS", 16)
+    stream = JsonArrayStream(export_path, "Saved Media")
+
+    first_item = next(iter(stream))
+
+    assert first_item == EXPORT["Saved Media"][0]
+    assert not stream._at_eof
+
+
+def test_malformed_json_raises(tmp_path: Path) -> None:
+    path = tmp_path / "broken.json"
+    path.write_text('{"Saved Media": [{"Date": }]}', encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(JsonArrayStream(path, "Saved Media"))
@@ -45,6 +45,9 @@ def test_log_file_levels(
             "request_timeout": 30,
             "ffmpeg_timeout": 60,
             "stream_chunk_size": 1024 * 1024,
+            "processing_workers": 2,
+            "cpu_workers": 0,
+            "state_db": None,
         }
         Config.cli_options = cli_options
         Config.logs_folder = temp_dir
@@ -18,9 +18,18 @@ def test_max_attempts_behavior(max_attempts: int) -> None:
         "jpeg_quality": 95,
         "convert_to_jxl": True,
         "log_level": logging.CRITICAL,
+        "min_concurrent_downloads": None,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+        "jxl_workers": 1,
+        "scratch_dir": None,
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
     Config.cli_options = cli_options
     md = MemoryDownloader()
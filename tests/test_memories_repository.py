@@ -0,0 +1,122 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from src.config import Config
+from src.downloader.downloader import MemoryDownloader
+from src.memories import memories_repository
+from src.memories.memories_repository import MemoriesRepository
+from src.ui import StatsManager
+
+
+def make_item(index: int) -> dict:
+    return {
+        "Date": "2023-12-05 12:34:56 UTC",
+        "Media Download Url": f"http://example.com/{index}",
+        "Media Type": "Image",
+    }
+
+
+@pytest.fixture(autouse=True)
+def json_path(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setattr(Config, "cli_options", {"log_level": logging.CRITICAL})
+    path = tmp_path / "memories_history.json"
+    path.write_text(json.dumps({"Saved Media": [make_item(i) for i in range(5)]}))
+    monkeypatch.setattr(Config, "json_path", path)
+    monkeypatch.setattr(MemoriesRepository, "_journal_entries", 0)
+    monkeypatch.setattr(MemoriesRepository, "_open_streams", 0)
+    monkeypatch.setattr(MemoriesRepository, "_compaction_deferred", False)
+    return path
+
+
+def saved_urls(json_path: Path) -> list[str]:
+    data = json.loads(json_path.read_text())
+    return [item["Media Download Url"] for item in data["Saved Media"]]
+
+
+def test_prune_appends_to_journal_without_rewriting_json(json_path: Path) -> None:
+    before = json_path.read_text()
+
+    MemoriesRepository().prune_by_media_download_url("http://example.com/1")
+
+    assert json_path.read_text() == before
+    journal = MemoriesRepository._journal_path().read_text()
+    assert journal == '"http://example.com/1"\n'
+
+
+def test_compact_removes_journaled_items(json_path: Path) -> None:
+    MemoriesRepository().prune_by_media_download_url("http://example.com/1")
+    MemoriesRepository().prune_by_media_download_url("http://example.com/3")
+
+    MemoriesRepository.compact()
+
+    assert saved_urls(json_path) == [f"http://example.com/{i}" for i in (0, 2, 4)]
+    assert not MemoriesRepository._journal_path().exists()
+    assert not json_path.with_name(f"{json_path.name}.tmp").exists()
+
+
+def test_startup_replays_leftover_journal(json_path: Path) -> None:
+    MemoriesRepository._journal_path().write_text(
+        '"http://example.com/0"\n"http://example.com/4'
+    )
+
+    items = MemoriesRepository().get_raw_items()
+
+    # The unterminated last line is from an interrupted append and is ignored
+    assert [item["Media Download Url"] for item in items] == [
+        f"http://example.com/{i}" for i in (1, 2, 3, 4)
+    ]
+    assert saved_urls(json_path) == [f"http://example.com/{i}" for i in (1, 2, 3, 4)]
+
+
+def test_journal_compacts_periodically(json_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(memories_repository, "JOURNAL_COMPACT_INTERVAL", 2)
+
+    MemoriesRepository().prune_by_media_download_url("http://example.com/0")
+    assert len(saved_urls(json_path)) == 5
+
+    MemoriesRepository().prune_by_media_download_url("http://example.com/1")
+    assert len(saved_urls(json_path)) == 3
+    assert not MemoriesRepository._journal_path().exists()
+
+
+def test_compaction_waits_for_the_open_stream(json_path: Path) -> None:
+    item_count = memories_repository.JOURNAL_COMPACT_INTERVAL + 100
+    json_path.write_text(
+        json.dumps({"Saved Media": [make_item(i) for i in range(item_count)]})
+    )
+    before = json_path.read_text()
+    items = MemoriesRepository().iter_raw_items()
+
+    streamed = [next(items)]
+    for i in range(item_count):
+        MemoriesRepository().prune_by_media_download_url(f"http://example.com/{i}")
+    # Replacing the JSON under the open stream fails on Windows
+    assert json_path.read_text() == before
+
+    streamed.extend(items)
+    assert len(streamed) == item_count
+    assert saved_urls(json_path) == []
+    assert not MemoriesRepository._journal_path().exists()
+
+
+def test_items_are_counted_without_parsing(monkeypatch) -> None:
+    # Keys split across chunk boundaries must be counted exactly once
+    monkeypatch.setattr(memories_repository, "COUNT_CHUNK_BYTES", 7)
+    MemoriesRepository._journal_path().write_text('"http://example.com/2"\n')
+
+    assert MemoriesRepository.count_raw_items() == 4
+
+
+def test_total_is_known_before_the_first_memory() -> None:
+    StatsManager.total_files = 0
+    memory_downloader = MemoryDownloader()
+    memory_downloader.state_store = None
+    memories = memory_downloader._gather_download_tasks()
+
+    next(memories)
+    assert StatsManager.total_files == 5
+    assert len(list(memories)) == 4
+    assert StatsManager.total_files == 5
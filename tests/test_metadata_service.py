@@ -1,7 +1,9 @@
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import piexif
 import pytest
+from PIL import Image
 
 from src.metadata.image_metadata_writer import ImageMetadataWriter
 from src.metadata.video_metadata_writer import VideoMetadataWriter
@@ -24,14 +26,49 @@ def mock_memory_video() -> MagicMock:
 
 
 def test_write_image_metadata(mock_memory_image: MagicMock, mocker) -> None:
-    mock_img = MagicMock()
-    mock_open = mocker.patch("PIL.Image.open")
-    mock_open.return_value.__enter__.return_value = mock_img
     mock_dump = mocker.patch("piexif.dump", return_value=b"exifbytes")
+    mock_insert = mocker.patch("piexif.insert")
     writer = ImageMetadataWriter(mock_memory_image, Path("dummy.jpg"))
     # Call the actual _save_image_with_exif to trigger piexif.dump
     writer._save_image_with_exif()
     assert mock_dump.called
+    mock_insert.assert_called_once_with(b"exifbytes", "dummy.jpg")
+
+
+def test_write_image_metadata_keeps_jpeg_scan_data(
+    mock_memory_image: MagicMock, tmp_path: Path
+) -> None:
+    file_path = tmp_path / "image.jpg"
+    Image.new("RGB", (16, 16), (10, 200, 30)).save(file_path, quality=80)
+    original = file_path.read_bytes()
+
+    ImageMetadataWriter(mock_memory_image, file_path).write_image_metadata()
+
+    written = file_path.read_bytes()
+    start_of_scan = b"\xff\xda"
+    assert (
+        written[written.index(start_of_scan) :]
+        == original[original.index(start_of_scan) :]
+    )
+    exif = piexif.load(str(file_path))
+    assert exif["Exif"][piexif.ExifIFD.DateTimeOriginal] == b"2023:12:05 12:34:56"
+    assert exif["GPS"][piexif.GPSIFD.GPSLongitudeRef] == b"W"
+
+
+def test_write_image_metadata_reencodes_non_jpeg(
+    mock_memory_image: MagicMock, tmp_path: Path, mocker
+) -> None:
+    mocker.patch(
+        "src.metadata.image_metadata_writer.Config.cli_options", {"jpeg_quality": 95}
+    )
+    file_path = tmp_path / "image.png"
+    Image.new("RGB", (16, 16)).save(file_path)
+
+    ImageMetadataWriter(mock_memory_image, file_path).write_image_metadata()
+
+    with Image.open(file_path) as image:
+        exif = image.getexif()
+    assert exif[piexif.ImageIFD.DateTime] == "2023:12:05 12:34:56"
 
 
 def test_write_video_metadata(mock_memory_video: MagicMock, mocker) -> None:
@@ -0,0 +1,126 @@
+import subprocess
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from imageio_ffmpeg import get_ffmpeg_exe
+
+from src.overlay.mp4_header import (
+    VideoInfo,
+    probe_video,
+    read_faststart_header,
+    read_moov,
+)
+
+
+def make_video(path: Path, *extra_arguments: str, codec: str = "libx264") -> Path:
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=size=48x32:rate=10:duration=2",
+            "-c:v",
+            codec,
+            "-pix_fmt",
+            "yuv420p",
+            *extra_arguments,
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+def test_probe_reads_size_duration_and_codec(tmp_path) -> None:
+    video_path = make_video(tmp_path / "video.mp4")
+
+    with Path.open(video_path, "rb") as video:
+        video_info = probe_video(read_moov(video))
+
+    assert video_info == VideoInfo(48, 32, 2.0, "avc1")
+
+
+def test_probe_reads_faststart_header(tmp_path) -> None:
+    video_path = make_video(tmp_path / "video.mp4", "-movflags", "+faststart")
+
+    header = read_faststart_header(BytesIO(video_path.read_bytes()))
+
+    assert probe_video(header) == VideoInfo(48, 32, 2.0, "avc1")
+
+
+def test_probe_swaps_size_of_rotated_video(tmp_path) -> None:
+    video_path = make_video(tmp_path / "video.mp4")
+    rotated_path = tmp_path / "rotated.mp4"
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-display_rotation",
+            "90",
+            "-i",
+            str(video_path),
+            "-c",
+            "copy",
+            str(rotated_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    with Path.open(rotated_path, "rb") as video:
+        video_info = probe_video(read_moov(video))
+
+    assert (video_info.width, video_info.height) == (32, 48)
+
+
+def test_probe_skips_audio_tracks(tmp_path) -> None:
+    video_path = tmp_path / "video.mp4"
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=1",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=size=48x32:rate=10:duration=1",
+            "-map",
+            "0:a",
+            "-map",
+            "1:v",
+            "-pix_fmt",
+            "yuv420p",
+            str(video_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    with Path.open(video_path, "rb") as video:
+        video_info = probe_video(read_moov(video))
+
+    assert (video_info.width, video_info.height) == (48, 32)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"not an mp4 at all",
+        b"\x00\x00\x00\x10moov\x00\x00\x00\x08trak",
+        b"\x00\x00\x00\xffmoov",
+    ],
+)
+def test_probe_rejects_malformed_headers(data: bytes) -> None:
+    assert probe_video(data) is None
+
+
+def test_read_moov_without_moov() -> None:
+    assert read_moov(BytesIO(b"\x00\x00\x00\x08free\x00\x00\x00\x08mdat")) is None
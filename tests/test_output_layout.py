@@ -0,0 +1,53 @@
+import pytest
+
+from src import OutputLayout
+from src.config import Config
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def downloads_folder(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    monkeypatch.setattr(Config, "cli_options", {"output_layout": "flat"})
+    OutputLayout.reset()
+    return tmp_path
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.jpg",
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    ("layout", "relative_folder"),
+    [("flat", "."), ("year", "2023"), ("month", "2023/12")],
+)
+def test_folder_follows_layout(
+    downloads_folder, memory, layout: str, relative_folder: str
+) -> None:
+    Config.cli_options["output_layout"] = layout
+
+    folder = OutputLayout.folder_for(memory)
+
+    assert folder == (downloads_folder / relative_folder).resolve()
+    assert folder.is_dir()
+
+
+def test_folder_is_created_once(downloads_folder, memory, monkeypatch) -> None:
+    Config.cli_options["output_layout"] = "month"
+    OutputLayout.folder_for(memory)
+    calls = []
+    monkeypatch.setattr(
+        type(downloads_folder), "mkdir", lambda *_a, **_k: calls.append(1)
+    )
+
+    OutputLayout.folder_for(memory)
+
+    assert calls == []
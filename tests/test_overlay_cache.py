@@ -0,0 +1,123 @@
+import logging
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src import FileNameResolver
+from src.config import Config
+from src.media_dispatcher.zip_processor import ZipProcessor
+from src.memories import Memory
+from src.overlay import OverlayCache, overlay_cache
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "apply_overlay": True,
+            "write_metadata": False,
+            "convert_to_jxl": False,
+            "jpeg_quality": 95,
+            "cpu_workers": 0,
+            "scratch_dir": tmp_path / "scratch",
+            "log_level": logging.CRITICAL,
+        },
+    )
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    FileNameResolver.reset()
+    OverlayCache.close()
+    yield
+    FileNameResolver.reset()
+    OverlayCache.close()
+
+
+def png_bytes(color: tuple, size: tuple[int, int] = (10, 10)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGBA", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_image_is_prepared_once_per_size() -> None:
+    overlay = png_bytes((255, 0, 0, 128))
+
+    first, first_hit = OverlayCache.image(overlay, (8, 8))
+    second, second_hit = OverlayCache.image(overlay, (8, 8))
+    resized, resized_hit = OverlayCache.image(overlay, (16, 16))
+
+    assert (first_hit, second_hit, resized_hit) == (False, True, False)
+    assert second is first
+    assert first.mode == "RGBA"
+    assert (first.size, resized.size) == ((8, 8), (16, 16))
+
+
+def test_least_recently_used_overlay_is_evicted(monkeypatch) -> None:
+    # Room for two 8x8 RGBA overlays
+    monkeypatch.setattr(overlay_cache, "MAX_CACHE_BYTES", 2 * 8 * 8 * 4)
+    red, green, blue = (png_bytes(color) for color in ["red", "green", "blue"])
+
+    OverlayCache.image(red, (8, 8))
+    OverlayCache.image(green, (8, 8))
+    OverlayCache.image(red, (8, 8))
+    OverlayCache.image(blue, (8, 8))
+
+    assert OverlayCache.image(red, (8, 8))[1]
+    assert not OverlayCache.image(green, (8, 8))[1]
+
+
+def test_png_is_written_once(tmp_path) -> None:
+    overlay = png_bytes((0, 0, 255, 64))
+
+    with OverlayCache.png(overlay, (8, 8)) as (first_path, first_hit):
+        pass
+    with OverlayCache.png(overlay, (8, 8)) as (second_path, second_hit):
+        assert Image.open(second_path).size == (8, 8)
+
+    assert (first_hit, second_hit) == (False, True)
+    assert first_path == second_path
+    assert first_path.parent == tmp_path / "scratch"
+    OverlayCache.close()
+    assert not first_path.exists()
+
+
+def test_png_in_use_outlives_eviction(monkeypatch) -> None:
+    monkeypatch.setattr(overlay_cache, "MAX_CACHE_BYTES", 8 * 8 * 4)
+
+    with OverlayCache.png(png_bytes("red"), (8, 8)) as (png_path, _):
+        OverlayCache.image(png_bytes("green"), (8, 8))
+        assert png_path.exists()
+
+    assert not png_path.exists()
+
+
+def make_archive(path: Path, overlay: bytes) -> Path:
+    media = BytesIO()
+    Image.new("RGB", (10, 10), "white").save(media, format="JPEG")
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.writestr("media.jpg", media.getvalue())
+        zip_file.writestr("overlay.png", overlay)
+    return path
+
+
+def test_zip_processor_reports_cache_hits(tmp_path) -> None:
+    overlay = png_bytes((0, 0, 0, 0))
+    memories = [
+        Memory.model_validate(
+            {
+                "Date": f"2023-12-05 12:34:5{index} UTC",
+                "Media Download Url": f"http://example.com/{index}.zip",
+                "Media Type": "Image",
+            },
+        )
+        for index in range(2)
+    ]
+
+    for index, memory in enumerate(memories):
+        archive = make_archive(tmp_path / f"{index}.jpg", overlay)
+        ZipProcessor(memory, archive).run()
+
+    assert [memory.overlay_cache_hit for memory in memories] == [False, True]
@@ -0,0 +1,89 @@
+import logging
+from pathlib import Path
+from threading import Event
+from unittest.mock import patch
+
+import pytest
+
+from src.config import Config
+from src.downloader.processing_stage import ProcessingStage
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options():
+    Config.cli_options = {
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
+        "log_level": logging.CRITICAL,
+    }
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.jpg",
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+
+
+def test_failed_download_skips_processing(memory) -> None:
+    with patch("src.downloader.processing_stage.process_media") as mock_process:
+        stage = ProcessingStage()
+        stage.hand_over(memory, None, download_succeeded=False)
+        result = stage.results.get(timeout=5)
+        stage.close()
+
+    assert result == (memory, None, False)
+    mock_process.assert_not_called()
+
+
+def test_downloaded_file_is_processed(memory) -> None:
+    processed_path = Path("processed.jpg")
+    with patch(
+        "src.downloader.processing_stage.process_media",
+        return_value=processed_path,
+    ):
+        stage = ProcessingStage()
+        stage.hand_over(memory, Path("raw.jpg"), download_succeeded=True)
+        result = stage.results.get(timeout=5)
+        stage.close()
+
+    assert result == (memory, processed_path, True)
+
+
+def test_processing_error_is_reported_as_failure(memory) -> None:
+    with patch(
+        "src.downloader.processing_stage.process_media",
+        side_effect=OSError("disk full"),
+    ):
+        stage = ProcessingStage()
+        stage.hand_over(memory, Path("raw.jpg"), download_succeeded=True)
+        result = stage.results.get(timeout=5)
+        stage.close()
+
+    assert result == (memory, None, False)
+
+
+def test_queue_is_bounded_by_worker_count(memory) -> None:
+    release = Event()
+    with patch(
+        "src.downloader.processing_stage.process_media",
+        side_effect=lambda _memory, file_path: release.wait() and file_path,
+    ):
+        stage = ProcessingStage()
+        assert stage.queue_capacity == 4
+        # Two items keep both workers busy, the next four fill the queue
+        for _ in range(6):
+            stage.hand_over(memory, Path("raw.jpg"), download_succeeded=True)
+        assert stage.peak_queue_depth <= stage.queue_capacity
+        release.set()
+        results = [stage.results.get(timeout=5) for _ in range(6)]
+        stage.close()
+
+    assert all(succeeded for _, _, succeeded in results)
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.config import Config
+from src.downloader.download_service import DownloadService
+from src.downloader.part_file import PartFile
+from src.downloader.rate_limiter import (
+    MAX_RETRY_AFTER_SECONDS,
+    RateLimiter,
+    TokenBucket,
+    parse_retry_after,
+)
+from src.downloader.retry_policy import RetryPolicy
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {"rate_limit": None, "bandwidth_limit": None, "max_attempts": 1},
+    )
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    RateLimiter.close()
+    yield
+    RateLimiter.close()
+
+
+def make_memory() -> Memory:
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/media",
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests() -> None:
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve(1) == pytest.approx(0.2, abs=0.01)
+
+
+def test_unlimited_by_default() -> None:
+    assert RateLimiter.request_delay() == 0
+    assert RateLimiter.bytes_delay(10**9) == 0
+
+
+def test_bandwidth_limit_delays_large_chunks() -> None:
+    Config.cli_options["bandwidth_limit"] = 1000
+    assert RateLimiter.bytes_delay(1000) == 0
+    assert RateLimiter.bytes_delay(500) == pytest.approx(0.5, abs=0.01)
+
+
+def test_request_limit_delays_requests() -> None:
+    Config.cli_options["rate_limit"] = 2
+    assert RateLimiter.request_delay() == 0
+    assert RateLimiter.request_delay() == 0
+    assert RateLimiter.request_delay() == pytest.approx(0.5, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("120", 120.0), ("0", 0.0), (None, None), ("", None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value: str | None, expected: float | None) -> None:
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date() -> None:
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == (
+        pytest.approx(60, abs=2)
+    )
+
+
+def test_retry_after_pauses_every_download() -> None:
+    assert RateLimiter.honor_retry_after({"Retry-After": "30"}, "a.jpg")
+    assert RateLimiter.request_delay() == pytest.approx(30, abs=1)
+    assert not RateLimiter.honor_retry_after({}, "b.jpg")
+
+
+def test_retry_after_is_capped() -> None:
+    RateLimiter.honor_retry_after({"Retry-After": "86400"}, "a.jpg")
+    assert RateLimiter.request_delay() <= MAX_RETRY_AFTER_SECONDS
+
+
+def test_throttled_attempt_is_not_counted() -> None:
+    memory = make_memory()
+    memory.attempts = 1
+    service = DownloadService(memory)
+    service._handle_fetch_failure(429, {"Retry-After": "1"}, PartFile(memory))
+
+    assert memory.error_code == "429"
+    assert memory.throttled_attempts == 1
+    assert RetryPolicy().should_retry(memory)
+
+
+def test_rate_limit_without_retry_after_counts() -> None:
+    memory = make_memory()
+    memory.attempts = 1
+    service = DownloadService(memory)
+    service._handle_fetch_failure(429, {}, None)
+
+    assert memory.throttled_attempts == 0
+    assert not RetryPolicy().should_retry(memory)
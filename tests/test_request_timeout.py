@@ -22,6 +22,9 @@ def test_request_timeout_behavior(timeout: int, tmp_path) -> None:
         "request_timeout": timeout,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
     memory = Memory.model_validate(
         {
@@ -42,8 +45,12 @@ def test_request_timeout_behavior(timeout: int, tmp_path) -> None:
         mock_get.return_value = mock_response
         mock_img_open.return_value.__enter__.return_value = MagicMock()
         ds = DownloadService(memory)
-        ds._build_session = MagicMock(return_value=MagicMock(get=mock_get))
+        ds._get_session = MagicMock(return_value=MagicMock(get=mock_get))
         ds._store_downloaded_memory = MagicMock(return_value=tmp_path / "file.jpg")
         ds.memory = memory
         ds.run()
-        mock_get.assert_called_with(memory.media_download_url, timeout=timeout)
+        mock_get.assert_called_with(
+            memory.media_download_url,
+            headers={"Accept-Encoding": "identity"},
+            timeout=timeout,
+        )
@@ -0,0 +1,156 @@
+import logging
+from hashlib import sha256
+from unittest.mock import MagicMock
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from src.config import Config
+from src.downloader.download_service import DownloadService
+from src.downloader.part_file import PartFile
+from src.downloader.retry_policy import RetryPolicy
+from src.memories import Memory
+
+BODY = b"0123456789"
+
+
+@pytest.fixture(autouse=True)
+def temp_config(tmp_path, monkeypatch):
+    Config.cli_options = {
+        "log_level": logging.CRITICAL,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+        "request_timeout": 30,
+        "stream_chunk_size": 4,
+    }
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.mp4",
+            "Media Type": "Video",
+            "Location": None,
+        },
+    )
+
+
+def make_response(status_code: int, body: bytes, headers: dict) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.iter_content.side_effect = lambda chunk_size: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    return response
+
+
+def full_response(body: bytes = BODY) -> MagicMock:
+    return make_response(
+        200,
+        body,
+        {
+            "Content-Length": str(len(BODY)),
+            "ETag": '"abc"',
+            "Content-Type": "video/mp4",
+        },
+    )
+
+
+def test_interrupted_download_keeps_part_file(memory) -> None:
+    part_file = PartFile(memory)
+
+    file_path = DownloadService(memory)._store_downloaded_memory(
+        full_response(BODY[:6]), part_file
+    )
+
+    assert file_path is None
+    assert part_file.path.read_bytes() == BODY[:6]
+
+
+def test_resume_headers_use_part_size_and_etag(memory) -> None:
+    part_file = PartFile(memory)
+    DownloadService(memory)._store_downloaded_memory(full_response(BODY[:6]), part_file)
+
+    assert part_file.resume_headers() == {"Range": "bytes=6-", "If-Range": '"abc"'}
+
+
+def test_partial_content_appends_and_promotes(memory) -> None:
+    part_file = PartFile(memory)
+    service = DownloadService(memory)
+    service._store_downloaded_memory(full_response(BODY[:6]), part_file)
+    resumed = make_response(206, BODY[6:], {"Content-Range": "bytes 6-9/10"})
+
+    assert part_file.accepts(resumed.status_code, resumed.headers)
+    file_path = service._store_downloaded_memory(resumed, part_file)
+
+    assert file_path.name == memory.filename_with_ext
+    assert file_path.read_bytes() == BODY
+    assert not part_file.path.exists()
+    assert not part_file.validators_path.exists()
+    assert memory.content_digest == sha256(BODY).hexdigest()
+
+
+def test_ignored_range_restarts_from_zero(memory) -> None:
+    part_file = PartFile(memory)
+    service = DownloadService(memory)
+    service._store_downloaded_memory(full_response(BODY[:6]), part_file)
+
+    file_path = service._store_downloaded_memory(full_response(), part_file)
+
+    assert file_path.read_bytes() == BODY
+
+
+def test_wrong_content_range_is_rejected(memory) -> None:
+    part_file = PartFile(memory)
+    DownloadService(memory)._store_downloaded_memory(full_response(BODY[:6]), part_file)
+    resumed = make_response(206, BODY[3:], {"Content-Range": "bytes 3-9/10"})
+
+    assert not part_file.accepts(resumed.status_code, resumed.headers)
+
+
+def test_finished_part_is_promoted_without_a_request(memory) -> None:
+    # A crash between the last write and the rename left a complete .part file
+    part_file = PartFile(memory)
+    part_file.path.write_bytes(BODY)
+    part_file._save_validators(full_response().headers)
+    service = DownloadService(memory)
+    service._download_memory = MagicMock()
+
+    file_path, succeeded = service.run()
+
+    assert succeeded
+    service._download_memory.assert_not_called()
+    assert file_path.read_bytes() == BODY
+    assert not part_file.path.exists()
+    assert memory.content_digest == sha256(BODY).hexdigest()
+
+
+def test_unsatisfiable_range_is_retried_from_zero(memory) -> None:
+    part_file = PartFile(memory)
+    DownloadService(memory)._store_downloaded_memory(full_response(BODY[:6]), part_file)
+    service = DownloadService(memory)
+    service._download_memory = MagicMock(return_value=make_response(416, b"", {}))
+
+    assert service.run() == (None, False)
+    assert not part_file.path.exists()
+    assert RetryPolicy.is_transient(memory.error_code)
+
+
+def test_media_is_requested_without_compression(memory) -> None:
+    part_file = PartFile(memory)
+    DownloadService(memory)._store_downloaded_memory(full_response(BODY[:6]), part_file)
+    service = DownloadService(memory)
+    service._download_memory = MagicMock(return_value=make_response(416, b"", {}))
+
+    service.run()
+
+    assert service._download_memory.call_args.args[0] == {
+        "Accept-Encoding": "identity",
+        "Range": "bytes=6-",
+        "If-Range": '"abc"',
+    }
@@ -0,0 +1,213 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from src.config import Config
+from src.downloader import retry_policy
+from src.downloader.async_downloader import AsyncMemoryDownloader
+from src.downloader.download_task import DownloadTask
+from src.downloader.downloader import MemoryDownloader
+from src.downloader.retry_policy import RetryPolicy
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "max_concurrent_downloads": 2,
+            "processing_workers": 1,
+            "cpu_workers": 0,
+            "state_db": None,
+            "max_attempts": 3,
+            "log_level": logging.CRITICAL,
+            "min_concurrent_downloads": None,
+            "rate_limit": None,
+            "bandwidth_limit": None,
+            "output_layout": "flat",
+            "jxl_workers": 1,
+            "scratch_dir": None,
+            "request_timeout": 30,
+        },
+    )
+    monkeypatch.setattr(retry_policy, "BASE_BACKOFF_SECONDS", 0.001)
+
+
+def make_memory(url: str = "http://example.com/media") -> Memory:
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": url,
+            "Media Type": "Image",
+            "Location": None,
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    ("error_code", "transient"),
+    [
+        ("500", True),
+        ("503", True),
+        ("429", True),
+        ("408", True),
+        ("NET", True),
+        ("DL", True),
+        ("403", False),
+        ("404", False),
+        ("410", False),
+        ("LOC", False),
+        ("FILE", False),
+        (None, False),
+    ],
+)
+def test_error_classification(error_code: str | None, transient: bool) -> None:
+    assert RetryPolicy.is_transient(error_code) is transient
+
+
+def test_backoff_grows_and_is_capped(monkeypatch) -> None:
+    monkeypatch.setattr(retry_policy, "BASE_BACKOFF_SECONDS", 1.0)
+    for attempt in range(1, 12):
+        ceiling = min(2 ** (attempt - 1), retry_policy.MAX_BACKOFF_SECONDS)
+        assert ceiling / 2 <= RetryPolicy.backoff_seconds(attempt) <= ceiling
+
+
+def test_attempts_are_capped() -> None:
+    memory = make_memory()
+    memory.error_code = "503"
+    memory.attempts = 2
+    assert RetryPolicy().should_retry(memory)
+    memory.attempts = 3
+    assert not RetryPolicy().should_retry(memory)
+
+
+def run_with_responses(engine: type, error_codes: list[str | None]) -> Memory:
+    memory = make_memory()
+    responses = iter(error_codes)
+    memory_downloader = engine()
+    memory_downloader._gather_download_tasks = lambda: iter([memory])
+    memory_downloader._check_for_success = lambda *_args: None
+
+    def fake_download(task: DownloadTask) -> tuple[None, bool]:
+        task.memory.error_code = next(responses)
+        return None, task.memory.error_code is None
+
+    async def fake_download_async(
+        task: DownloadTask, _http_session: object
+    ) -> tuple[None, bool]:
+        return fake_download(task)
+
+    with (
+        patch("src.downloader.download_task.DownloadTask.run", fake_download),
+        patch(
+            "src.downloader.download_task.DownloadTask.run_async",
+            fake_download_async,
+        ),
+    ):
+        memory_downloader.run()
+    return memory
+
+
+@pytest.mark.parametrize("engine", [MemoryDownloader, AsyncMemoryDownloader])
+def test_transient_failures_are_retried(engine: type) -> None:
+    memory = run_with_responses(engine, ["503", "NET", None, "503"])
+    assert memory.attempts == 3
+
+
+@pytest.mark.parametrize("engine", [MemoryDownloader, AsyncMemoryDownloader])
+def test_permanent_failures_fail_fast(engine: type) -> None:
+    memory = run_with_responses(engine, ["410", None])
+    assert memory.attempts == 1
+    assert memory.error_code == "410"
+
+
+@pytest.mark.parametrize("engine", [MemoryDownloader, AsyncMemoryDownloader])
+def test_retries_stop_at_max_attempts(engine: type) -> None:
+    memory = run_with_responses(engine, ["500", "500", "500", None])
+    assert memory.attempts == 3
+    assert memory.error_code == "500"
+
+
+@pytest.mark.parametrize("engine", [MemoryDownloader, AsyncMemoryDownloader])
+def test_unexpected_errors_still_post_a_result(engine: type) -> None:
+    memory = make_memory()
+    memory_downloader = engine()
+    memory_downloader._gather_download_tasks = lambda: iter([memory])
+    results = []
+    memory_downloader._check_for_success = lambda *args: results.append(args)
+
+    def failing_download(*_args: object) -> tuple[None, bool]:
+        raise OSError
+
+    async def failing_download_async(*_args: object) -> tuple[None, bool]:
+        raise OSError
+
+    with (
+        patch("src.downloader.download_task.DownloadTask.run", failing_download),
+        patch(
+            "src.downloader.download_task.DownloadTask.run_async",
+            failing_download_async,
+        ),
+    ):
+        memory_downloader.run()
+
+    assert len(results) == 1
+    assert memory.error_code == "FILE"
+    assert memory.attempts == 1
+
+
+def test_backoff_does_not_hold_a_download_thread(monkeypatch) -> None:
+    Config.cli_options["max_concurrent_downloads"] = 1
+    monkeypatch.setattr(retry_policy, "BASE_BACKOFF_SECONDS", 0.2)
+    flaky, healthy = make_memory("http://example.com/a"), make_memory()
+    responses = {flaky.media_download_url: iter(["503", None])}
+    downloaded = []
+    memory_downloader = MemoryDownloader()
+    memory_downloader._gather_download_tasks = lambda: iter([flaky, healthy])
+    memory_downloader._check_for_success = lambda *_args: None
+
+    def fake_download(task: DownloadTask) -> tuple[None, bool]:
+        url = task.memory.media_download_url
+        downloaded.append(url)
+        task.memory.error_code = next(responses.get(url, iter([None])))
+        return None, task.memory.error_code is None
+
+    with patch("src.downloader.download_task.DownloadTask.run", fake_download):
+        memory_downloader.run()
+
+    # The only download thread moved on to the next memory during the backoff
+    assert downloaded == [
+        flaky.media_download_url,
+        healthy.media_download_url,
+        flaky.media_download_url,
+    ]
+
+
+def test_interrupt_fails_memories_waiting_for_a_retry(monkeypatch) -> None:
+    monkeypatch.setattr(retry_policy, "BASE_BACKOFF_SECONDS", 60.0)
+    flaky, healthy = make_memory("http://example.com/a"), make_memory()
+    memory_downloader = MemoryDownloader()
+    memory_downloader._gather_download_tasks = lambda: iter([flaky, healthy])
+    results = []
+
+    def check_for_success(succeeded: bool, memory: Memory, *_args: object) -> None:
+        results.append((memory, succeeded))
+        if memory is healthy:
+            raise KeyboardInterrupt
+
+    def fake_download(task: DownloadTask) -> tuple[None, bool]:
+        task.memory.error_code = "503" if task.memory is flaky else None
+        return None, task.memory.error_code is None
+
+    memory_downloader._check_for_success = check_for_success
+    with (
+        patch("src.downloader.download_task.DownloadTask.run", fake_download),
+        patch("src.downloader.downloader.UpdateUI"),
+    ):
+        memory_downloader.run()
+
+    assert (flaky, False) in results
+    assert flaky.attempts == 1
@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from src.config import Config
+from src.memories import Memory
+from src.memories.state_store import StateStore
+
+
+def make_item(index: int) -> dict:
+    return {
+        "Date": f"2023-12-05 12:34:{index:02d} UTC",
+        "Media Download Url": f"http://example.com/{index}",
+        "Media Type": "Image",
+    }
+
+
+@pytest.fixture(autouse=True)
+def json_path(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "memories_history.json"
+    path.write_text(json.dumps({"Saved Media": [make_item(i) for i in range(5)]}))
+    monkeypatch.setattr(Config, "json_path", path)
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {"log_level": logging.CRITICAL, "state_db": tmp_path / "state.db"},
+    )
+    return path
+
+
+@pytest.fixture
+def store():
+    store = StateStore.open_configured()
+    store.sync_from_json()
+    yield store
+    store.close()
+
+
+def pending_urls(store: StateStore, batch_size: int = 2) -> list[str]:
+    return [m.media_download_url for m in store.iter_pending(batch_size=batch_size)]
+
+
+def test_disabled_without_state_db(monkeypatch) -> None:
+    monkeypatch.setitem(Config.cli_options, "state_db", None)
+    assert StateStore.open_configured() is None
+
+
+def test_sync_imports_items_as_pending(store: StateStore) -> None:
+    assert store.count_pending() == 5
+    assert pending_urls(store) == [f"http://example.com/{i}" for i in range(5)]
+
+
+def test_recorded_success_is_no_longer_pending(store: StateStore, tmp_path) -> None:
+    output_path = tmp_path / "out.jpg"
+    output_path.write_bytes(b"12345")
+    memory = Memory.model_validate(make_item(2))
+    memory.download_seconds = 1.5
+
+    store.record_result(memory, output_path, succeeded=True)
+
+    assert store.count_pending() == 4
+    row = store._connection.execute(
+        "SELECT status, attempts, output_path, size_bytes, download_seconds "
+        "FROM memories WHERE media_download_url = ?",
+        (memory.media_download_url,),
+    ).fetchone()
+    assert row == ("done", 1, str(output_path), 5, 1.5)
+
+
+def test_failures_count_attempts_and_keep_error(store: StateStore) -> None:
+    memory = Memory.model_validate(make_item(0))
+    memory.error_code = "403"
+
+    store.record_result(memory, None, succeeded=False)
+    store.record_result(memory, None, succeeded=False)
+
+    row = store._connection.execute(
+        "SELECT status, attempts, last_error FROM memories "
+        "WHERE media_download_url = ?",
+        (memory.media_download_url,),
+    ).fetchone()
+    assert row == ("failed", 2, "403")
+    assert store.count_pending() == 5
+
+
+def test_restart_keeps_status_and_skips_unchanged_json(
+    store: StateStore, json_path: Path, tmp_path
+) -> None:
+    output_path = tmp_path / "out.jpg"
+    output_path.write_bytes(b"1")
+    store.record_result(Memory.model_validate(make_item(0)), output_path, True)
+    imported_mtime_ns = int(store._get_meta("json_mtime"))
+    store.close()
+    # Unchanged mtime means the JSON is not parsed again
+    json_path.write_text("not json")
+    os.utime(json_path, ns=(imported_mtime_ns, imported_mtime_ns))
+
+    reopened = StateStore.open_configured()
+    reopened.sync_from_json()
+
+    assert reopened.count_pending() == 4
+    reopened.close()
@@ -2,9 +2,11 @@ import logging
 from unittest.mock import MagicMock, patch
 
 import pytest
+from requests.structures import CaseInsensitiveDict
 
 from src.config import Config
 from src.downloader.download_service import DownloadService
+from src.downloader.part_file import PartFile
 from src.memories import Memory
 
 
@@ -19,9 +21,18 @@ def test_stream_chunk_size_behavior(chunk_size: int, tmp_path) -> None:
         "jpeg_quality": 95,
         "convert_to_jxl": True,
         "log_level": logging.CRITICAL,
+        "min_concurrent_downloads": None,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+        "jxl_workers": 1,
+        "scratch_dir": None,
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": chunk_size,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
     }
     memory = Memory.model_validate(
         {
@@ -42,8 +53,47 @@ def test_stream_chunk_size_behavior(chunk_size: int, tmp_path) -> None:
         mock_get.return_value = mock_response
         mock_img_open.return_value.__enter__.return_value = MagicMock()
         ds = DownloadService(memory)
-        ds._build_session = MagicMock(return_value=MagicMock(get=mock_get))
+        ds._get_session = MagicMock(return_value=MagicMock(get=mock_get))
         ds._store_downloaded_memory = MagicMock(return_value=tmp_path / "file.jpg")
         ds.memory = memory
         ds.run()
-        mock_get.assert_called_with(memory.media_download_url, timeout=30)
+        mock_get.assert_called_with(
+            memory.media_download_url,
+            headers={"Accept-Encoding": "identity"},
+            timeout=30,
+        )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_store_downloaded_memory_streams_chunks(
+    chunk_size: int, tmp_path, monkeypatch
+) -> None:
+    Config.cli_options = {
+        "stream_chunk_size": chunk_size,
+        "rate_limit": None,
+        "bandwidth_limit": None,
+        "output_layout": "flat",
+    }
+    monkeypatch.setattr(Config, "downloads_folder", tmp_path)
+    memory = Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.mp4",
+            "Media Type": "Video",
+            "Location": None,
+        },
+    )
+    body = b"0123456789"
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = CaseInsensitiveDict({"Content-Length": str(len(body))})
+    mock_response.iter_content.side_effect = lambda chunk_size: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+
+    file_path = DownloadService(memory)._store_downloaded_memory(
+        mock_response, PartFile(memory)
+    )
+
+    mock_response.iter_content.assert_called_once_with(chunk_size=chunk_size)
+    assert file_path.read_bytes() == body
@@ -0,0 +1,159 @@
+import logging
+import subprocess
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from imageio_ffmpeg import get_ffmpeg_exe
+from PIL import Image
+
+from src import FileNameResolver
+from src.config import Config
+from src.media_dispatcher.zip_processor import ZipProcessor
+from src.memories import Memory
+from src.overlay import OverlayCache, VideoComposer
+from src.overlay.mp4_header import VideoInfo, probe_video, read_faststart_header
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "apply_overlay": True,
+            "write_metadata": True,
+            "video_codec": "h264",
+            "ffmpeg_preset": "ultrafast",
+            "ffmpeg_pixel_format": "yuv420p",
+            "crf": 23,
+            "ffmpeg_timeout": 60,
+            "scratch_dir": tmp_path / "scratch",
+            "log_level": logging.CRITICAL,
+        },
+    )
+    FileNameResolver.reset()
+    yield
+    FileNameResolver.reset()
+    OverlayCache.close()
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.zip",
+            "Media Type": "Video",
+            "Location": None,
+        },
+    )
+
+
+def make_video(path: Path, faststart: bool) -> bytes:
+    movflags = ["-movflags", "+faststart"] if faststart else []
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=size=32x32:rate=10:duration=1",
+            "-pix_fmt",
+            "yuv420p",
+            *movflags,
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return path.read_bytes()
+
+
+def make_archive(path: Path, video: bytes) -> Path:
+    overlay = BytesIO()
+    Image.new("RGBA", (30, 30), (255, 0, 0, 128)).save(overlay, format="PNG")
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.writestr("media.mp4", video)
+        zip_file.writestr("overlay.png", overlay.getvalue())
+    return path
+
+
+@pytest.mark.parametrize("faststart", [True, False])
+def test_faststart_header_detection(tmp_path, faststart: bool) -> None:
+    video = make_video(tmp_path / "video.mp4", faststart)
+
+    header = read_faststart_header(BytesIO(video))
+
+    if faststart:
+        assert header is not None
+        assert video.startswith(header)
+        assert b"moov" in header
+    else:
+        assert header is None
+
+
+def test_truncated_header_is_not_faststart() -> None:
+    assert read_faststart_header(BytesIO(b"\x00\x00\x00\x20ftypisom")) is None
+
+
+@pytest.mark.parametrize("faststart", [True, False])
+def test_overlay_video_rendered_from_archive(memory, tmp_path, faststart) -> None:
+    video = make_video(tmp_path / "source.mp4", faststart)
+    archive = make_archive(tmp_path / "file.mp4", video)
+    probed = []
+
+    def record_probe(header: bytes) -> VideoInfo | None:
+        probed.append(header)
+        return probe_video(header)
+
+    with (
+        patch("src.overlay.video_composer.probe_video", side_effect=record_probe),
+        patch.object(VideoComposer, "_get_video_dimensions") as mock_ffprobe,
+    ):
+        output_path = ZipProcessor(memory, archive).run()
+
+    mock_ffprobe.assert_not_called()
+    if faststart:
+        # Streamed from the archive, nothing is unpacked
+        assert video.startswith(probed[0])
+    else:
+        assert probed[0][4:8] == b"moov"
+    assert output_path == tmp_path / "file.mp4"
+    # Only the cached overlay stays until the run ends
+    assert [path.suffix for path in (tmp_path / "scratch").iterdir()] == [".png"]
+    OverlayCache.close()
+    assert not list((tmp_path / "scratch").iterdir())
+    details = subprocess.run(
+        [get_ffmpeg_exe(), "-i", str(output_path)],
+        capture_output=True,
+        text=True,
+        check=False,
+    ).stderr
+    assert "creation_time   : 2023-12-05T12:34:56" in details
+    assert "32x32" in details
+
+
+@pytest.mark.parametrize("faststart", [True, False])
+def test_ffprobe_is_the_fallback(memory, tmp_path, faststart) -> None:
+    video = make_video(tmp_path / "source.mp4", faststart)
+    archive = make_archive(tmp_path / "file.mp4", video)
+
+    with (
+        patch("src.overlay.video_composer.probe_video", return_value=None),
+        patch.object(
+            VideoComposer, "_get_video_dimensions", return_value=(32, 32)
+        ) as mock_ffprobe,
+    ):
+        ZipProcessor(memory, archive).run()
+
+    video_input, header = mock_ffprobe.call_args.args
+    if faststart:
+        assert video_input == "pipe:0"
+        assert video.startswith(header)
+    else:
+        assert Path(video_input).parent == tmp_path / "scratch"
+        assert header is None
@@ -0,0 +1,127 @@
+import logging
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from imageio_ffmpeg import get_ffmpeg_exe
+from PIL import Image
+
+from src.config import Config
+from src.media_dispatcher import ProcessVideo
+from src.memories import Memory
+
+
+@pytest.fixture(autouse=True)
+def cli_options(monkeypatch):
+    monkeypatch.setattr(
+        Config,
+        "cli_options",
+        {
+            "write_metadata": True,
+            "video_codec": "h264",
+            "ffmpeg_preset": "ultrafast",
+            "ffmpeg_pixel_format": "yuv420p",
+            "crf": 23,
+            "ffmpeg_timeout": 60,
+            "log_level": logging.CRITICAL,
+        },
+    )
+
+
+@pytest.fixture
+def memory():
+    return Memory.model_validate(
+        {
+            "Date": "2023-12-05 12:34:56 UTC",
+            "Media Download Url": "http://example.com/file.mp4",
+            "Media Type": "Video",
+            "Location": "Latitude, Longitude: 48.85, 2.35",
+        },
+    )
+
+
+def make_video(path: Path) -> Path:
+    subprocess.run(
+        [
+            get_ffmpeg_exe(),
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=size=32x32:rate=10:duration=1",
+            "-pix_fmt",
+            "yuv420p",
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+def make_overlay(path: Path) -> Path:
+    Image.new("RGBA", (32, 32), (255, 0, 0, 128)).save(path)
+    return path
+
+
+def probe(path: Path) -> str:
+    result = subprocess.run(
+        [get_ffmpeg_exe(), "-i", str(path)], capture_output=True, text=True, check=False
+    )
+    return result.stderr
+
+
+def test_overlay_encode_and_metadata_share_one_ffmpeg_run(memory, tmp_path) -> None:
+    video_path = tmp_path / "video.mp4"
+    overlay_path = tmp_path / "overlay.png"
+
+    def render(command: list[str], **_kwargs: object) -> None:
+        Path(command[-1]).write_bytes(b"video")
+
+    with patch(
+        "src.converters.ffmpeg_converter.subprocess.run", side_effect=render
+    ) as mock_run:
+        ProcessVideo().run(memory, video_path, overlay_path)
+
+    mock_run.assert_called_once()
+    command = mock_run.call_args.args[0]
+    assert command[command.index("-filter_complex") + 1].endswith("[video]")
+    assert "libx264" in command
+    assert f"creation_time={memory.video_creation_time}" in command
+    assert command[-1] == str(video_path.with_suffix(".tmp.mp4"))
+
+
+def test_default_settings_only_remux_for_metadata(memory, tmp_path) -> None:
+    Config.cli_options["ffmpeg_preset"] = "fast"
+    with patch("src.metadata.video_metadata_writer.subprocess.run") as mock_run:
+        mock_run.return_value.returncode = 1
+        ProcessVideo().run(memory, tmp_path / "video.mp4")
+
+    command = mock_run.call_args.args[0]
+    assert command[command.index("-c") + 1] == "copy"
+    assert "-filter_complex" not in command
+
+
+def test_single_pass_produces_tagged_video(memory, tmp_path) -> None:
+    video_path = make_video(tmp_path / "video.mp4")
+    overlay_path = make_overlay(tmp_path / "overlay.png")
+
+    output_path = ProcessVideo().run(memory, video_path, overlay_path)
+
+    assert output_path == video_path
+    assert not video_path.with_suffix(".tmp.mp4").exists()
+    details = probe(output_path)
+    assert "creation_time   : 2023-12-05T12:34:56" in details
+    assert "32x32" in details
+
+
+def test_failed_pass_keeps_the_original(memory, tmp_path) -> None:
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"not a video")
+
+    with pytest.raises(subprocess.CalledProcessError):
+        ProcessVideo().run(memory, video_path, make_overlay(tmp_path / "o.png"))
+
+    assert video_path.read_bytes() == b"not a video"
+    assert not video_path.with_suffix(".tmp.mp4").exists()
@@ -23,6 +23,9 @@ def test_write_metadata_flag_behavior(write_metadata: bool, tmp_path: Path) -> N
         "request_timeout": 30,
         "ffmpeg_timeout": 60,
         "stream_chunk_size": 1024 * 1024,
+        "processing_workers": 2,
+        "cpu_workers": 0,
+        "state_db": None,
         "cjxl_timeout": 10,
     }
     memory = Memory.model_validate(